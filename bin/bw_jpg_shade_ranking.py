@@ -14,9 +14,25 @@ import time
 import shutil
 import statistics
 
-
 from PIL import Image
 
+# Try to create a working PYTHONPATH
+_BIN_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+_ROOT_DIRECTORY = os.path.abspath(os.path.join(_BIN_DIRECTORY, os.pardir))
+_EXPECTED = f"{os.sep}potpourri-python{os.sep}bin"
+if _BIN_DIRECTORY.endswith(_EXPECTED) is True:
+    sys.path.append(_ROOT_DIRECTORY)
+else:
+    print(
+        f"""\
+This script is not installed in the "{_EXPECTED}" directory. Please fix.\
+"""
+    )
+    sys.exit(2)
+
+# Library imports
+from photo import metadata as lib_metadata
+
 Shade = namedtuple("Shade", "filepath shade square")
 Batch = namedtuple("Batch", "filepath shade batch square")
 
@@ -260,59 +276,13 @@ def _filepaths(source):
     for filename in sorted(files):
         # Only interested in files
         filepath = "{}{}{}".format(source, os.sep, filename)
-        if _valid_file(filepath) is True:
+        if lib_metadata.valid_file(filepath) is True:
             result.append(filepath)
 
     # Return
     return result
 
 
-def _valid_file(filepath):
-    """Validate filepath.
-
-    Args:
-        filepath: filepath
-
-    Returns:
-        result: True if a valid file
-
-    """
-    # Initialize key variables
-    result = False
-
-    # Get a list of files
-    if os.path.isfile(filepath) is True:
-        # We are only interested in JPG
-        filetype = _filetype(filepath)
-        if filetype.unsupported is False:
-            result = True
-
-    # Return
-    return result
-
-
-def _filetype(filepath):
-    """Determine type of file.
-
-    Args:
-        filepath: Name of file
-
-    Returns:
-        result: True if JPG
-
-    """
-    # Initialize key variables
-    FileType = namedtuple("FileType", "jpg unsupported")
-    result = FileType(jpg=False, unsupported=True)
-
-    # Determine the type of file
-    if filepath.lower().endswith(".jpg") is True or (
-        filepath.lower().endswith(".jpeg") is True
-    ):
-        result = FileType(jpg=True, unsupported=False)
-    return result
-
-
 def _args():
     """Get the CLI arguments.
 
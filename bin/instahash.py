@@ -5,26 +5,48 @@ from __future__ import print_function
 
 import os
 import math
+import bisect
 import sys
-from collections import namedtuple
+from collections import namedtuple, Counter
 import csv
 import argparse
 import random
 import re
+import json
+import heapq
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from array import array
 from operator import attrgetter
 
 LIMIT_MAX = 10
+CATALOG_VERSION = 2
+
+Row = namedtuple("Row", "hashtag posts feature")
+
+# Errors raised while reading a missing, malformed or half-written file
+LOAD_ERRORS = (
+    OSError,
+    ValueError,
+    KeyError,
+    AttributeError,
+    TypeError,
+    csv.Error,
+)
 
 
 class Hashtags:
     """Class to evaluate file data."""
 
-    def __init__(self, rows, limit=25):
+    def __init__(self, rows, limit=25, usage=None):
         """Initialize the class.
 
         Args:
             rows: List of Row objects
             limit: The number of rows to select
+            usage: Dict of recent usage counts keyed by hashtag
 
         Returns:
             None
@@ -54,19 +76,58 @@ class Hashtags:
                 percent=entries[next_index].percent,
             )
 
-        # Get rows
-        self.rows = _select(rows, buckets, limit=limit)
+        # Partition once. Rows are only sampled when they are requested
+        self._buckets = buckets
+        self._partitions = _partition(rows, buckets)
+        self._limit = limit
+        self._usage = usage
+        self._rows = None
+
+    @property
+    def rows(self):
+        """Get the rows selected when the object was created.
+
+        Args:
+            None
+
+        Returns:
+            result: List of selected Row objects
+
+        """
+        # Sample on first use
+        if self._rows is None:
+            self._rows = self.sample(limit=self._limit, usage=self._usage)
+        result = self._rows
+        return result
+
+    def sample(self, limit=25, usage=None):
+        """Select a new set of rows from the buckets.
+
+        Args:
+            limit: The number of rows to select
+            usage: Dict of recent usage counts keyed by hashtag
+
+        Returns:
+            result: List of selected Row objects
+
+        """
+        # Return
+        result = _select(
+            self._partitions, self._buckets, limit=limit, usage=usage
+        )
+        return result
 
 
 class FeatureHashtags(Hashtags):
     """Class to evaluate file data for feature account hashtags."""
 
-    def __init__(self, rows, limit=25):
+    def __init__(self, rows, limit=25, usage=None):
         """Initialize the class.
 
         Args:
             rows: List of Row objects
             limit: The number of rows to select
+            usage: Dict of recent usage counts keyed by hashtag
 
         Returns:
             None
@@ -74,18 +135,19 @@ class FeatureHashtags(Hashtags):
         """
         # Instantiate
         _rows = [row for row in rows if row.feature is True]
-        Hashtags.__init__(self, _rows, limit=limit)
+        Hashtags.__init__(self, _rows, limit=limit, usage=usage)
 
 
 class RegularHashtags(Hashtags):
     """Class to evaluate file data for regular hashtags."""
 
-    def __init__(self, rows, limit=25):
+    def __init__(self, rows, limit=25, usage=None):
         """Initialize the class.
 
         Args:
             rows: List of Row objects
             limit: The number of rows to select
+            usage: Dict of recent usage counts keyed by hashtag
 
         Returns:
             None
@@ -93,60 +155,447 @@ class RegularHashtags(Hashtags):
         """
         # Instantiate
         _rows = [row for row in rows if row.feature is False]
-        Hashtags.__init__(self, _rows, limit=limit)
+        Hashtags.__init__(self, _rows, limit=limit, usage=usage)
+
+
+class Catalog:
+    """Class to manage a compiled, cached copy of the hashtag file."""
+
+    def __init__(self, filename):
+        """Initialize the class.
+
+        The parsed file is cached next to it as JSON columns sorted by the
+        number of posts, so later runs skip parsing the CSV. The cache is
+        rebuilt whenever the file's modification time or size changes, or if
+        it can't be read.
+
+        Args:
+            filename: Name of hashtag CSV file
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.filename = os.path.abspath(filename)
+        stat = os.stat(self.filename)
+        self.mtime = stat.st_mtime_ns
+        key = [CATALOG_VERSION, self.mtime, stat.st_size]
+        cache = "{}.catalog".format(self.filename)
+
+        # Read the cache if it is current
+        columns = _load(cache, key)
+        if columns is None:
+            data = _compile(self.filename)
+            data["key"] = key
+            _save(cache, data)
+            columns = _columns(data)
+
+        # Unpack the columns
+        self._hashtags, self._posts, self._feature = columns
+
+    def rows(self):
+        """Get the rows of the catalog.
+
+        The Row objects are created from the columns on each call.
+
+        Args:
+            None
+
+        Returns:
+            result: List of Row objects sorted by the number of posts
+
+        """
+        # Return
+        result = [
+            Row(hashtag=hashtag, posts=posts, feature=bool(feature))
+            for hashtag, posts, feature in zip(
+                self._hashtags, self._posts, self._feature
+            )
+        ]
+        return result
+
+
+class History:
+    """Class to track the hashtags of recently generated posts."""
+
+    def __init__(self, filename=None, depth=30):
+        """Initialize the class.
+
+        Args:
+            filename: Name of JSON file for storing history. History is not
+                persisted if None
+            depth: Number of most recent posts to remember
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self._filename = filename
+        self._depth = depth
+        self._posts = []
+
+        # Read history file
+        if bool(filename) is True and os.path.isfile(filename) is True:
+            try:
+                with open(filename, "r", encoding="utf-8") as fh_:
+                    self._posts = json.load(fh_).get("posts", [])
+            except:
+                self._posts = []
+
+    def usage(self):
+        """Get the number of times each hashtag was recently used.
+
+        Args:
+            None
+
+        Returns:
+            result: Counter of usage keyed by hashtag
+
+        """
+        # Return
+        result = Counter()
+        for hashtags in self._posts[-self._depth :]:
+            result.update(hashtags)
+        return result
+
+    def append(self, hashtags):
+        """Add the hashtags of a new post to the history.
+
+        Args:
+            hashtags: List of hashtags
+
+        Returns:
+            None
+
+        """
+        # Update
+        self._posts.append(sorted(hashtags))
+
+    def save(self):
+        """Save the history file.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Write to a temporary file, then rename into place
+        if bool(self._filename) is False:
+            return
+        directory = os.path.dirname(os.path.abspath(self._filename))
+        with tempfile.NamedTemporaryFile(
+            mode="w", delete=False, dir=directory, encoding="utf-8"
+        ) as fh_:
+            json.dump({"posts": self._posts[-self._depth :]}, fh_)
+        os.replace(fh_.name, self._filename)
+
 
+class Service:
+    """Class to create hashtags from pools that are loaded only once."""
 
-def _select(rows, buckets, limit=25):
+    def __init__(self, filename, cache_size=128):
+        """Initialize the class.
+
+        Args:
+            filename: Name of hashtag CSV file
+            cache_size: Maximum number of exclusion lists to keep pools for
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self._filename = filename
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._attempted = None
+        self._rows = None
+        self._pools = {}
+
+    def pools(self, excludes=None):
+        """Get the hashtag pools, reloading the file when it changes.
+
+        If the changed file can't be read, the pools of the last good copy
+        keep being used until the file changes again.
+
+        Args:
+            excludes: List of banned words in hashtags
+
+        Returns:
+            result: Tuple of FeatureHashtags and RegularHashtags objects
+
+        Raises:
+            One of LOAD_ERRORS if the file has never been loaded
+
+        """
+        # Initialize key variables
+        key = tuple(sorted(set(excludes))) if bool(excludes) else ()
+
+        with self._lock:
+            # Hot reload the file, trying each modification only once
+            try:
+                mtime = os.stat(self._filename).st_mtime_ns
+                if mtime != self._mtime and mtime != self._attempted:
+                    self._attempted = mtime
+                    self._rows = Catalog(self._filename).rows()
+                    self._mtime = mtime
+                    self._pools = {}
+            except LOAD_ERRORS as exception:
+                print(
+                    'Could not load "{}": {!r}'.format(
+                        self._filename, exception
+                    ),
+                    file=sys.stderr,
+                )
+                if self._rows is None:
+                    raise
+            if self._rows is None:
+                raise OSError(
+                    'No hashtags loaded from "{}"'.format(self._filename)
+                )
+
+            # Create pools for new exclusion lists
+            result = self._pools.get(key)
+            if result is None:
+                if len(self._pools) >= self._cache_size:
+                    self._pools = {}
+                rows = _exclude(self._rows, list(key))
+                result = (FeatureHashtags(rows), RegularHashtags(rows))
+                self._pools[key] = result
+
+        # Return
+        return result
+
+    def hashtags(
+        self,
+        limit=LIMIT_MAX,
+        feature_percent=25,
+        includes=None,
+        excludes=None,
+    ):
+        """Create a set of hashtags.
+
+        Args:
+            limit: The number of rows to select
+            feature_percent: Percentage of hashtags from feature accounts
+            includes: List of hashtags to add
+            excludes: List of banned words in hashtags
+
+        Returns:
+            result: List of hashtags
+
+        """
+        # Return
+        (features, regulars) = self.pools(excludes=excludes)
+        result = generate(
+            features,
+            regulars,
+            limit=limit,
+            feature_percent=feature_percent,
+            includes=includes,
+        )
+        return result
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Class to answer hashtag requests over HTTP."""
+
+    # Keep connections open between requests without Nagle delays
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        """Answer a GET request.
+
+        The query string accepts the same parameters as the CLI. For example
+        /?results=10&percent=50&includes=tag1,tag2&excludes=word
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Parse the query string
+        query = parse_qs(urlparse(self.path).query)
+        try:
+            (limit, percent) = _limits(
+                abs(int(query.get("results", [LIMIT_MAX])[-1])),
+                abs(int(query.get("percent", [50])[-1])),
+            )
+        except ValueError:
+            self.send_error(400, "Parameters must be integers")
+            return
+
+        # Create hashtags
+        try:
+            hashtags = self.server.service.hashtags(
+                limit=limit,
+                feature_percent=percent,
+                includes=_includes(query.get("includes")),
+                excludes=_excludes(query.get("excludes")),
+            )
+        except LOAD_ERRORS:
+            body = json.dumps({"error": "Hashtag file could not be loaded"})
+            self._respond(503, body, "application/json")
+            return
+
+        # Respond
+        self._respond(200, " ".join(hashtags), "text/plain; charset=utf-8")
+
+    def _respond(self, status, text, content_type):
+        """Send a complete response.
+
+        Args:
+            status: HTTP status code
+            text: Body of the response
+            content_type: Content-Type of the body
+
+        Returns:
+            None
+
+        """
+        # Respond
+        body = text.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """Suppress per request logging.
+
+        Args:
+            args: Logging arguments
+
+        Returns:
+            None
+
+        """
+        # Do nothing
+        return
+
+
+def serve(filename, host="127.0.0.1", port=8765):
+    """Answer hashtag requests over HTTP until interrupted.
+
+    Args:
+        filename: Name of hashtag CSV file
+        host: Address to listen on
+        port: TCP port to listen on
+
+    Returns:
+        None
+
+    """
+    # Load the pools before accepting requests. Requests get errors until
+    # the file can be loaded
+    service = Service(filename)
+    try:
+        service.pools()
+    except LOAD_ERRORS:
+        pass
+
+    # Serve
+    with ThreadingHTTPServer((host, port), _Handler) as server:
+        server.service = service
+        print("Serving hashtags on http://{}:{}/".format(host, port))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def _select(partitions, buckets, limit=25, usage=None):
     """Process data.
 
     Args:
-        rows: List of Row objects obtained from file
+        partitions: Dict of lists of Row objects keyed by bucket size
         buckets: Buckets for classifying rows
         limit: Maximum number of results
+        usage: Dict of recent usage counts keyed by hashtag
 
     Returns:
         selected: List of selected rows
 
     """
     # Initalize key variables
-    results = {}
     selected = []
-    max_iter = 5000
+    shortfall = 0
 
     # Select rows according to the bucket requirements
     for size, bucket in buckets.items():
-        # Initialize result for bucket
-        results[size] = []
-        count = 0
+        # Get the required number of items per bucket. Sparse buckets pass
+        # their shortfall on to the next bucket
+        required = math.ceil(limit * bucket.percent / 100) + shortfall
+        candidates = partitions[size]
+        count = min(required, len(candidates))
+        shortfall = required - count
 
-        # Get the required number of items per bucket
-        required = math.ceil(limit * bucket.percent / 100)
+        # Sample without replacement
+        selected.extend(_sample(candidates, count, usage=usage))
 
-        while len(results[size]) < required:
-            # Exit if insufficient items found
-            count += 1
-            if count > max_iter:
-                break
+    # Return
+    selected = sorted(selected, key=attrgetter("posts"), reverse=True)
+    return selected
 
-            # Randomly select row
-            row = random.choice(rows)
 
-            # Check if row is within the bucket range and if so, add
-            if bucket.min <= row.posts <= bucket.max:
-                found = bool(results.get(size))
-                if found:
-                    if row not in results[size]:
-                        results[size].append(row)
-                else:
-                    results[size].append(row)
+def _sample(rows, count, usage=None):
+    """Randomly sample rows, favouring the least recently used hashtags.
 
-    # Create a list of selected rows
-    for value in results.values():
-        selected.extend(value)
+    Args:
+        rows: List of Row objects
+        count: Number of rows to sample
+        usage: Dict of recent usage counts keyed by hashtag
+
+    Returns:
+        result: List of sampled Row objects
+
+    """
+    # Sample uniformly when there is no history
+    if bool(usage) is False:
+        return random.sample(rows, count)
+
+    # Least used first, with ties broken randomly
+    result = heapq.nsmallest(
+        count,
+        rows,
+        key=lambda row: (usage.get(row.hashtag, 0), random.random()),
+    )
+    return result
+
+
+def _partition(rows, buckets):
+    """Partition rows into buckets by their number of posts.
+
+    Args:
+        rows: List of Row objects obtained from file
+        buckets: Buckets for classifying rows
+
+    Returns:
+        result: Dict of lists of Row objects keyed by bucket size
+
+    """
+    # Initalize key variables
+    result = {}
+    ordered = sorted(rows, key=attrgetter("posts"))
+    posts = [row.posts for row in ordered]
+
+    # Bucket ranges are inclusive at both ends
+    for size, bucket in buckets.items():
+        start = bisect.bisect_left(posts, bucket.min)
+        stop = bisect.bisect_right(posts, bucket.max)
+        result[size] = ordered[start:stop]
 
     # Return
-    selected = sorted(selected, key=attrgetter("posts"), reverse=True)
-    return selected
+    return result
 
 
 def main():
@@ -160,8 +609,6 @@ def main():
 
     """
     # Initialize key variables
-    Row = namedtuple("Row", "hashtag posts feature")
-    rows = []
     args = _args()
     filename = os.path.expanduser(args.filename)
     limit = abs(args.results)
@@ -169,28 +616,27 @@ def main():
     verbose = args.verbose
     includes = _includes(args.includes)
     excludes = _excludes(args.excludes)
+    history_file = (
+        os.path.expanduser(args.history_file)
+        if bool(args.history_file)
+        else None
+    )
 
     # Add limits to the CLI parameters
-    percent = percent if 0 <= percent <= 100 else 25
-    limit = 30 if limit > 30 else math.ceil(limit)
+    (limit, percent) = _limits(limit, percent)
 
     # Process destination
     if os.path.isfile(filename) is False:
         print('Filename "{}" does not exist.'.format(filename))
         sys.exit(0)
 
-    # Read CSV file
-    with open(filename, newline="") as fh_:
-        reader = csv.DictReader(fh_, delimiter=",")
-        for row in reader:
-            if row["Hashtag"].startswith(";") is False:
-                rows.append(
-                    Row(
-                        hashtag=row["Hashtag"].lower().strip(),
-                        posts=abs(int(row["Posts"].strip().replace(",", ""))),
-                        feature=bool(row["Account"]),
-                    )
-                )
+    # Run as a service
+    if bool(args.serve) is True:
+        serve(filename, host=args.host, port=args.port)
+        return
+
+    # Read the compiled CSV file
+    rows = Catalog(filename).rows()
 
     # Create report
     report(
@@ -200,6 +646,8 @@ def main():
         includes=includes,
         excludes=excludes,
         verbose=verbose,
+        count=abs(args.count),
+        history=History(history_file),
     )
 
 
@@ -210,6 +658,8 @@ def report(
     includes=None,
     excludes=None,
     verbose=False,
+    count=1,
+    history=None,
 ):
     """Process data.
 
@@ -220,10 +670,75 @@ def report(
         includes: List of hashtags to add
         excluded: List of banned words in hashtags
         verbose: Verbose output if True
+        count: Number of distinct hashtag sets to create
+        history: History object of recently used hashtags
 
     Returns:
         None
 
+    """
+    # Initialize key variables
+    attempts = 10
+    seen = set()
+    history = History() if history is None else history
+    usage = history.usage()
+
+    # Remove banned items and partition once for all sets
+    rows = _exclude(rows, excludes)
+    features = FeatureHashtags(rows)
+    regulars = RegularHashtags(rows)
+
+    # Create each set, spreading hashtags evenly across them
+    for _ in range(max(1, count)):
+        for __ in range(attempts):
+            hashtags = generate(
+                features,
+                regulars,
+                limit=limit,
+                feature_percent=feature_percent,
+                includes=includes,
+                verbose=verbose,
+                usage=usage,
+            )
+            if frozenset(hashtags) not in seen:
+                break
+        seen.add(frozenset(hashtags))
+        usage.update(hashtags)
+        history.append(hashtags)
+
+        # Print results
+        # output = textwrap.wrap(
+        #     ' '.join(hashtags), width, break_long_words=False)
+        output = hashtags
+        print("\n\n{}{}\n".format(".\n" * 5, " ".join(output)))
+
+    # Remember what was used
+    history.save()
+
+
+def generate(
+    features,
+    regulars,
+    limit=LIMIT_MAX,
+    feature_percent=25,
+    includes=None,
+    verbose=False,
+    usage=None,
+):
+    """Create a set of hashtags.
+
+    Args:
+        features: FeatureHashtags object
+        regulars: RegularHashtags object
+        limit: The number of rows to select
+        feature_percent: Percentage of hashtags from feature accounts
+        includes: List of hashtags to add
+        verbose: Verbose output if True
+        usage: Dict of recent usage counts keyed by hashtag
+
+    Returns:
+        hashtags: List of hashtags
+
     """
     # Initialize key variables
     results = []
@@ -231,27 +746,29 @@ def report(
     mandatory_tags = ["#p3terharrisoncatalog"]
 
     # Get results for both hashtag types
-    features = FeatureHashtags(rows, limit=limit).rows
-    regulars = RegularHashtags(rows, limit=limit).rows
+    features = features.sample(limit=limit, usage=usage)
+    regulars = regulars.sample(limit=limit, usage=usage)
 
     # Randomly select proportionate numbers of feature and regular accounts
     results.extend(
-        random.sample(
+        _sample(
             regulars,
             min(
                 len(regulars), math.ceil(limit * (1 - (feature_percent / 100)))
             ),
+            usage=usage,
         )
     )
     results.extend(
-        random.sample(
+        _sample(
             features,
             min(len(features), math.ceil(limit * feature_percent / 100)),
+            usage=usage,
         )
     )
 
     # Randomly select `limit` numbers of results
-    results = random.sample(results, min(limit, len(results)))
+    results = _sample(results, min(limit, len(results)), usage=usage)
     hashtags = [_.hashtag for _ in results]
 
     # Verbose output if necessary
@@ -261,11 +778,6 @@ def report(
     # Shuffle hashtags to hide methodology
     random.shuffle(hashtags)
 
-    # Remove banned items
-    if isinstance(excludes, list):
-        for item in excludes:
-            hashtags = [_ for _ in hashtags if item.lower() not in _]
-
     # Trim hashtag list before includes
     hashtags = hashtags[:limit]
 
@@ -288,11 +800,165 @@ def report(
 
     # Trim hashtag list after includes
     hashtags = hashtags[:LIMIT_MAX]
+    return hashtags
+
+
+def _exclude(rows, excludes):
+    """Remove rows with hashtags containing banned words.
+
+    Args:
+        rows: List of Row objects
+        excludes: List of banned words in hashtags
+
+    Returns:
+        result: List of Row objects
+
+    """
+    # Initialize key variables
+    words = [
+        item.lower()
+        for item in (excludes if isinstance(excludes, list) else [])
+        if bool(item) is True
+    ]
+
+    # Nothing to do
+    if bool(words) is False:
+        return rows
+
+    # Match all words in a single pass over each hashtag
+    regex = re.compile("|".join([re.escape(word) for word in words]))
+    result = [row for row in rows if regex.search(row.hashtag) is None]
+    return result
+
+
+def _compile(filename):
+    """Parse the hashtag file into columns.
+
+    Args:
+        filename: Name of hashtag CSV file
+
+    Returns:
+        result: Dict of columns sorted by the number of posts
+
+    """
+    # Initialize key variables
+    rows = []
+
+    # Read CSV file
+    with open(filename, newline="") as fh_:
+        reader = csv.DictReader(fh_, delimiter=",")
+        for row in reader:
+            if row["Hashtag"].startswith(";") is False:
+                rows.append(
+                    Row(
+                        hashtag=row["Hashtag"].lower().strip(),
+                        posts=abs(int(row["Posts"].strip().replace(",", ""))),
+                        feature=bool(row["Account"]),
+                    )
+                )
+
+    # Sort by posts so that buckets are contiguous slices
+    rows = sorted(rows, key=attrgetter("posts"))
+    result = {
+        "size": len(rows),
+        "hashtags": "\n".join([_.hashtag for _ in rows]),
+        "posts": [_.posts for _ in rows],
+        "feature": [int(_.feature) for _ in rows],
+    }
+    return result
 
-    # Print results
-    # output = textwrap.wrap(' '.join(hashtags), width, break_long_words=False)
-    output = hashtags
-    print("\n\n{}{}\n".format(".\n" * 5, " ".join(output)))
+
+def _columns(data):
+    """Convert compiled catalog data to columns.
+
+    Args:
+        data: Dict of compiled catalog data
+
+    Returns:
+        result: Tuple of (list of hashtags, array of posts, bytes of feature
+            flags). None if the data is malformed
+
+    """
+    # Return
+    try:
+        size = data["size"]
+        hashtags = data["hashtags"].split("\n") if size else []
+        posts = array("q", data["posts"])
+        feature = bytes(data["feature"])
+    except (AttributeError, KeyError, TypeError, ValueError, OverflowError):
+        return None
+    if not len(hashtags) == len(posts) == len(feature) == size:
+        return None
+    result = (hashtags, posts, feature)
+    return result
+
+
+def _load(filepath, key):
+    """Read compiled catalog data.
+
+    Args:
+        filepath: Name of cache file
+        key: Key the data must have to be current
+
+    Returns:
+        result: Tuple of columns. None if the file is missing, unreadable,
+            malformed or out of date
+
+    """
+    # Read the file
+    try:
+        with open(filepath, encoding="utf-8") as fh_:
+            data = json.load(fh_)
+    except (OSError, ValueError):
+        return None
+
+    # Return
+    if isinstance(data, dict) is False or data.get("key") != key:
+        return None
+    result = _columns(data)
+    return result
+
+
+def _save(filepath, data):
+    """Atomically save compiled catalog data.
+
+    Args:
+        filepath: Name of cache file
+        data: Data to save
+
+    Returns:
+        None
+
+    """
+    # Write to a temporary file, then rename into place
+    try:
+        with tempfile.NamedTemporaryFile(
+            mode="w",
+            encoding="utf-8",
+            delete=False,
+            dir=os.path.dirname(filepath),
+        ) as fh_:
+            json.dump(data, fh_)
+        os.replace(fh_.name, filepath)
+    except OSError:
+        pass
+
+
+def _limits(limit, percent):
+    """Apply limits to the requested number of results and percentage.
+
+    Args:
+        limit: The number of rows to select
+        percent: Percentage of hashtags from feature accounts
+
+    Returns:
+        result: Tuple of limit and percentage
+
+    """
+    # Return
+    percent = percent if 0 <= percent <= 100 else 25
+    limit = 30 if limit > 30 else math.ceil(limit)
+    return (limit, percent)
 
 
 def _includes(includes):
@@ -315,7 +981,8 @@ def _includes(includes):
 
             # Add hashtags
             for hashtag in hashtags:
-                if bool(re.match(r"^\w+$", hashtag).group(0)) is True:
+                # Skip tokens with apostrophes or other non word characters
+                if bool(re.match(r"^\w+$", hashtag)) is True:
                     result.append("#{}".format(hashtag.lower()))
 
     # Return
@@ -342,7 +1009,8 @@ def _excludes(excludes):
 
             # Add hashtags
             for hashtag in hashtags:
-                if bool(re.match(r"^\w+$", hashtag).group(0)) is True:
+                # Skip tokens with apostrophes or other non word characters
+                if bool(re.match(r"^\w+$", hashtag)) is True:
                     result.append(hashtag.lower())
 
     # Return
@@ -399,6 +1067,41 @@ def _args():
         default=LIMIT_MAX,
         help=("Number of results to return. Default: {}".format(LIMIT_MAX)),
     )
+    parser.add_argument(
+        "--count",
+        type=int,
+        required=False,
+        default=1,
+        help="Number of distinct hashtag sets to create. Default: 1",
+    )
+    parser.add_argument(
+        "--history_file",
+        type=str,
+        required=False,
+        help=(
+            "JSON file of recently used hashtags. Recently used hashtags "
+            "are less likely to be selected again."
+        ),
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run as a local HTTP service instead of printing results.",
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        required=False,
+        default="127.0.0.1",
+        help="Address the service listens on. Default: 127.0.0.1",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        required=False,
+        default=8765,
+        help="TCP port the service listens on. Default: 8765",
+    )
     parser.add_argument(
         "--verbose", action="store_true", help="increase output verbosity"
     )
@@ -7,12 +7,26 @@ import os
 import sys
 from collections import namedtuple
 import argparse
-import hashlib
 import shutil
 
-from PIL import Image
-from PIL.ExifTags import TAGS
-import piexif
+# Try to create a working PYTHONPATH
+_BIN_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+_ROOT_DIRECTORY = os.path.abspath(os.path.join(_BIN_DIRECTORY, os.pardir))
+_EXPECTED = f"{os.sep}potpourri-python{os.sep}bin"
+if _BIN_DIRECTORY.endswith(_EXPECTED) is True:
+    sys.path.append(_ROOT_DIRECTORY)
+else:
+    print(
+        f"""\
+This script is not installed in the "{_EXPECTED}" directory. Please fix.\
+"""
+    )
+    sys.exit(2)
+
+# Library imports
+from photo import metadata as lib_metadata
+
+Move = namedtuple("Move", "source destination digest rename")
 
 
 def main():
@@ -53,20 +67,79 @@ Destination directory '{}' does not exist.""".format(
                 sys.exit(0)
 
         # Process
-        _process(source, destination)
-
-
-def _process(source, destination):
+        _process(
+            source,
+            destination,
+            dry_run=args.dry_run,
+            batch_size=args.batch_size,
+            parallel=args.parallel,
+        )
+
+
+def _process(
+    source, destination, dry_run=False, batch_size=100, parallel=False
+):
     """Process data.
 
     Args:
         source: Root directory to process
         destination: Destination to place file with EXIF data
+        dry_run: Print the move plan without moving files if True
+        batch_size: Number of moves to journal at a time
+        parallel: Use parallel processing if True
 
     Returns:
         None
 
     """
+    # Initialize key variables
+    journal = _journal_filepath(destination)
+
+    # Resume an interrupted run if there is one, otherwise create a plan
+    moves = _pending(journal)
+    if bool(moves) is True:
+        print(
+            """\
+Resuming {} pending moves from journal '{}'.""".format(
+                len(moves), journal
+            )
+        )
+    else:
+        moves = _plan(source, destination, parallel=parallel)
+
+    # Print the plan only
+    if bool(dry_run) is True:
+        for move in moves:
+            print(
+                "{}: {} -> {}".format(
+                    "Rename" if move.rename else "Copy  ",
+                    move.source,
+                    move.destination,
+                )
+            )
+        return
+
+    # Move the files
+    _execute(moves, journal, batch_size=batch_size)
+
+
+def _plan(source, destination, parallel=False):
+    """Create a plan of files to move.
+
+    Args:
+        source: Root directory to process
+        destination: Destination to place file with EXIF data
+        parallel: Use parallel processing if True
+
+    Returns:
+        result: List of Move objects
+
+    """
+    # Initialize key variables
+    result = []
+    filepaths = []
+    device = os.stat(destination).st_dev
+
     # Get a recursive listing of files
     for directory, _, filenames in os.walk(source):
         for filename in filenames:
@@ -81,248 +154,167 @@ def _process(source, destination):
                     continue
 
                 # Process
-                if _valid_file(in_filepath) is True:
-                    data = _metadata(in_filepath)
-
-                    # Compatible with Rapid Photo Downloader?
-                    compatible = data.get("Model")
-                    if bool(compatible) is True:
-                        print(
-                            f"""\
-{in_filepath:25}: Model: {compatible:25}: {bool(compatible)}"""
-                        )
+                if lib_metadata.valid_file(in_filepath) is True:
+                    filepaths.append(in_filepath)
 
-                        # Get the extension
-                        (_, extension) = in_filepath.split(".")
+    # Get the metadata and digest of each file, opening it only once
+    photos = lib_metadata.evaluate(filepaths, parallel=parallel)
 
-                        # Get the out_filepath
-                        digest = _digest(in_filepath)
-                        if bool(digest) is True:
-                            out_filepath = "{}{}{}.{}".format(
-                                destination, os.sep, digest, extension
-                            ).replace("{0}{0}".format(os.sep), os.sep)
+    # Process
+    for in_filepath, photo in zip(filepaths, photos):
+        # Compatible with Rapid Photo Downloader?
+        compatible = photo.metadata.get("Model")
+        if bool(compatible) is True:
+            print(
+                f"""\
+{in_filepath:25}: Model: {compatible:25}: {bool(compatible)}"""
+            )
 
-                            print(f"""Creating: {out_filepath:25}""")
-                            shutil.move(in_filepath, out_filepath)
+            # Get the extension
+            (_, extension) = in_filepath.split(".")
+
+            # Get the out_filepath
+            digest = photo.digest
+            if bool(digest) is True:
+                out_filepath = "{}{}{}.{}".format(
+                    destination, os.sep, digest, extension
+                ).replace("{0}{0}".format(os.sep), os.sep)
+
+                # Renames on the same device are zero-copy
+                result.append(
+                    Move(
+                        source=in_filepath,
+                        destination=out_filepath,
+                        digest=digest,
+                        rename=os.stat(in_filepath).st_dev == device,
+                    )
+                )
 
-                    else:
-                        print(
-                            f"""\
+        else:
+            print(
+                f"""\
 {in_filepath:25}: Model: {'None':25}: {bool(compatible)}"""
-                        )
-
-
-def _digest(filepath):
-    """Get the HEX digest of file.
-
-    Args:
-        filepath: File path
-
-    Returns:
-        result: Hex digest
+            )
 
-    """
     # Return
-    result = None
-    with open(filepath, "rb") as fh_:
-        data = fh_.read()
-        result = hashlib.sha512(data).hexdigest()
     return result
 
 
-def _metadata(filepath):
-    """Get exif data.
-
-    https://exiftool.org/TagNames/EXIF.html has a full list of tags
+def _execute(moves, journal, batch_size=100):
+    """Move files in batches, journaling the progress of each batch.
 
     Args:
-        filepath: Filepath
+        moves: List of Move objects
+        journal: Journal filepath
+        batch_size: Number of moves to journal at a time
 
     Returns:
         None
 
     """
-    # Initialize key variables
-    result = {}
-
-    dict_list = _image(filepath)
-    dict_list.extend(_zeroth(filepath))
-    dict_list.extend(_exif(filepath))
+    # Record the complete plan before moving anything
+    with open(journal, "w", encoding="utf-8") as fh_:
+        for move in moves:
+            fh_.write(
+                "plan\t{}\t{}\t{}\t{}\n".format(
+                    int(move.rename),
+                    move.digest,
+                    move.source,
+                    move.destination,
+                )
+            )
+        _sync(fh_)
+
+    # Process the plan in batches
+    with open(journal, "a", encoding="utf-8") as fh_:
+        for index in range(0, len(moves), max(1, batch_size)):
+            for move in moves[index : index + max(1, batch_size)]:
+                # Skip moves completed before an interruption
+                if os.path.isfile(move.source) is False and (
+                    os.path.isfile(move.destination) is True
+                ):
+                    fh_.write("done\t{}\n".format(move.source))
+                    continue
 
-    # Process data
-    for item in dict_list:
-        for key, value in item.items():
-            result[key] = value
+                print(f"""Creating: {move.destination:25}""")
+                if bool(move.rename) is True:
+                    os.rename(move.source, move.destination)
+                else:
+                    shutil.move(move.source, move.destination)
+                fh_.write("done\t{}\n".format(move.source))
 
-    return result
+            # Checkpoint the batch
+            _sync(fh_)
 
+    # The plan is complete
+    os.remove(journal)
 
-def _exif(filepath):
-    """Process exif data.
 
-    https://exiftool.org/TagNames/EXIF.html has a full list of tags
-
-    pprint(TAGS) to get a full list known to the package
+def _pending(journal):
+    """Get the moves of an interrupted run from its journal.
 
     Args:
-        filepath: Filepath
+        journal: Journal filepath
 
     Returns:
-        None
+        result: List of Move objects not yet completed
 
     """
     # Initialize key variables
-    result = []
-    meta = None
-
-    # Read data
-    with Image.open(filepath) as image:
-        # Get all Exif. The '0th', '1st' and 'Exif' sections of the spec
-        exifdata = image.info.get("exif")
-        if bool(exifdata):
-            meta = piexif.load(exifdata)
-
-    # Process data
-    if bool(meta) is True:
-        for ifd in ("0th", "Exif", "GPS", "1st"):
-            for tag in meta[ifd]:
-                label = piexif.TAGS[ifd][tag]["name"]
-                value = meta[ifd][tag]
-                if isinstance(value, bytes):
-                    try:
-                        value = value.decode()
-                    except:
-                        continue
-
-                # Fixup
-                if label == "ExposureTime":
-                    value = "{}/{}".format(value[0], value[1])
-                if label == "FNumber":
-                    value = float(value[0] / value[1])
-
-                result.append({label: value})
+    planned = {}
+    done = set()
+
+    # Read the journal
+    if os.path.isfile(journal) is False:
+        return []
+    with open(journal, "r", encoding="utf-8") as fh_:
+        for line in fh_:
+            fields = line.rstrip("\n").split("\t")
+            if fields[0] == "plan" and len(fields) == 5:
+                planned[fields[3]] = Move(
+                    source=fields[3],
+                    destination=fields[4],
+                    digest=fields[2],
+                    rename=bool(int(fields[1])),
+                )
+            elif fields[0] == "done" and len(fields) == 2:
+                done.add(fields[1])
 
     # Return
+    result = [move for source, move in planned.items() if source not in done]
     return result
 
 
-def _image(filepath):
-    """Get basic image data from file.
-
-    Args:
-        filepath: Filepath
-
-    Returns:
-        result: List of image data dicts
-
-    """
-    # Initialize key variables
-    result = []
-
-    # Read data
-    with Image.open(filepath) as image:
-        # Extract image metadata
-        lookup = {
-            "Filename": image.filename,
-            "Image Size": image.size,
-            "Image Height": image.height,
-            "Image Width": image.width,
-            "Image Format": image.format,
-            "Image Mode": image.mode,
-            "Image is Animated": getattr(image, "is_animated", False),
-            "Frames in Image": getattr(image, "n_frames", 1),
-        }
-
-    # Process data
-    for label, value in lookup.items():
-        result.append({label: value})
-    return result
-
-
-def _zeroth(filepath):
-    """Extract a subset of the EXIF data. The '0th' section of the spec.
-
-    https://exiftool.org/TagNames/EXIF.html has a full list of tags
-
-    Args:
-        filepath: Filepath
-
-    Returns:
-        result: List of image data dicts
-
-    """
-    # Initialize key variables
-    result = []
-
-    # Read data
-    with Image.open(filepath) as image:
-        # Extract a subset of the EXIF data.
-        # The '0th' section of the specification
-        zeroth = image.getexif()
-
-    # Process data
-    for tag_id in zeroth:
-        # Get the tag name, instead of human unreadable tag id
-        tag = TAGS.get(tag_id, tag_id)
-        value = zeroth.get(tag_id)
-
-        # Decode bytes
-        if isinstance(value, bytes):
-            try:
-                value = value.decode()
-            except:
-                value = None
-
-        if bool(value):
-            result.append({"0th {}".format(tag): value})
-
-    return result
-
-
-def _valid_file(filepath):
-    """Validate filepath.
+def _journal_filepath(destination):
+    """Get the journal filepath for the destination directory.
 
     Args:
-        filepath: filepath
+        destination: Destination directory
 
     Returns:
-        result: True if a valid file
+        result: Journal filepath
 
     """
-    # Initialize key variables
-    result = False
-
-    # Get a list of files
-    if os.path.isfile(filepath) is True:
-        # We are only interested in JPG
-        filetype = _filetype(filepath)
-        if filetype.unsupported is False:
-            result = True
-
     # Return
+    result = "{}{}.mv_if_exif.journal".format(destination, os.sep).replace(
+        "{0}{0}".format(os.sep), os.sep
+    )
     return result
 
 
-def _filetype(filepath):
-    """Determine type of file.
+def _sync(fh_):
+    """Flush a file handle to disk.
 
     Args:
-        filepath: Name of file
+        fh_: File handle
 
     Returns:
-        result: True if JPG
+        None
 
     """
-    # Initialize key variables
-    FileType = namedtuple("FileType", "jpg unsupported")
-    result = FileType(jpg=False, unsupported=True)
-
-    # Determine the type of file
-    if filepath.lower().endswith(".jpg") is True or (
-        filepath.lower().endswith(".jpeg") is True
-    ):
-        result = FileType(jpg=True, unsupported=False)
-    return result
+    # Flush and sync
+    fh_.flush()
+    os.fsync(fh_.fileno())
 
 
 def _args():
@@ -349,6 +341,22 @@ def _args():
         type=str,
         help="Destination of photos with EXIF data.",
     )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=100,
+        help="Number of moves to journal at a time. Default = 100",
+    )
+    parser.add_argument(
+        "--dry_run",
+        action="store_true",
+        help="Print the move plan without moving any files.",
+    )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Use multiprocessing.",
+    )
     result = parser.parse_args()
     return result
 
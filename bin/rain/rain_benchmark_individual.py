@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Benchmarks the per row cost of classifying contacts as individuals."""
+
+# Standard imports
+import argparse
+import os
+import sys
+import re
+import time
+
+# PIP imports
+import pandas as pd
+
+# Try to create a working PYTHONPATH
+_BIN_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+_ROOT_DIRECTORY = os.path.abspath(
+    os.path.join(
+        os.path.abspath(os.path.join(_BIN_DIRECTORY, os.pardir)), os.pardir
+    )
+)
+_EXPECTED = f"{os.sep}potpourri-python{os.sep}bin{os.sep}rain"
+if _BIN_DIRECTORY.endswith(_EXPECTED) is True:
+    sys.path.append(_ROOT_DIRECTORY)
+else:
+    print(
+        f"""\
+This script is not installed in the "{_EXPECTED}" directory. Please fix.\
+"""
+    )
+    sys.exit(2)
+
+# Library imports
+from rain.Y2024.mailer import humans
+
+
+def main():
+    """Main Function."""
+    # Get the CLI arguments
+    args = cli()
+    human_file = os.path.abspath(os.path.expanduser(args.human_file))
+
+    # Get the columns to classify
+    df_ = pd.read_csv(human_file, header=0, delimiter="\t")
+    names = df_["contact_name"].fillna("").astype(str).str.split()
+    columns = pd.DataFrame(
+        {
+            "firstname": names.str[0].fillna("").str.strip(),
+            "lastname": names.str[-1].fillna("").str.strip(),
+            "email": df_["contact_email"].fillna("").astype(str),
+            "contact_kind": df_["contact_kind"].fillna("").astype(str),
+        }
+    )
+    rows = list(columns.itertuples(index=False, name=None))
+
+    # Time each implementation
+    timings = [
+        ("Keyword loop (before)", lambda: [_legacy(*_) for _ in rows]),
+        (
+            "Compiled classifier",
+            lambda: humans._individuals(
+                columns["firstname"],
+                columns["lastname"],
+                columns["email"],
+                columns["contact_kind"],
+            ).tolist(),
+        ),
+    ]
+    results = []
+    for label, function in timings:
+        start = time.perf_counter()
+        results.append(function())
+        duration = time.perf_counter() - start
+        print(
+            f"""\
+{label:25}: {duration:8.3f}s {duration * 1e6 / max(1, len(rows)):8.2f}us/row"""
+        )
+
+    # All implementations must agree
+    match = results[0] == results[1]
+    print(f"Rows                     : {len(rows)}")
+    print(f"Results match            : {match}")
+
+
+def _legacy(firstname, lastname, email, contact_kind):
+    """Classify a contact using the original keyword loop.
+
+    Args:
+        firstname: First name
+        lastname: Last name
+        email: Email address
+        contact_kind: Kind of contact (individual, group)
+
+    Returns:
+        result: True if individual
+
+    """
+    # Initialize key variables
+    result = True
+    departments = [
+        "admin", "master", "network", "noc", "netops", "contact", "wireless",
+        "operations", "contact", "support", "dns", "office", "team",
+        "account", "group", "dept", "department", "service", "eng",
+        "address", "llc", "information", "security", "cto", "tech",
+        "telecom", "center", "chief", "number", "division", "manag",
+        "ar" "in", "ops", "whois", "ceo", "test", "officer", "cloud",
+        "president", "owner", "purchasing", "help", "desk", "infra",
+        "billing", "ltd", "partner", "registr", "albuquerque", "corp",
+        "founder", "domain", "internet", "analyst", "licence", "ciso",
+        "office", "operator", "procure", "register", "notify", "poc",
+        "ipaddr", "isp", "pilot", "company", "peer", "coord", "info@",
+        "scanning", "routing", "staff", "internet", "connect", "allocation",
+    ]  # fmt: skip
+    names = ["abuse", "legal"]
+
+    # Check strings that should only appear in people and department names
+    for item in departments:
+        if (
+            item.lower() in firstname.lower()
+            or (item.lower() in lastname.lower())
+            or (item.lower() in email.lower().split("@")[0])
+        ):
+            result = False
+            break
+        if firstname.lower() == lastname.lower():
+            result = False
+            break
+        if firstname.lower() == "it" or lastname.lower() == "it":
+            result = False
+            break
+        if len(re.sub("[^0-9a-zA-Z]+", "", firstname)) == 1:
+            result = False
+            break
+
+    # Check strings that should only appear in people names
+    for item in names:
+        if item.lower() in firstname.lower() or (
+            item.lower() in lastname.lower()
+        ):
+            result = False
+            break
+
+    # If the organization says that this is a group,
+    # then it's not an individual
+    if contact_kind.lower() == "group":
+        result = False
+
+    # Return
+    return result
+
+
+def cli():
+    """Parse the CLI.
+
+    Args:
+        args: None
+
+    Returns:
+        args: ArgumentParser
+
+    """
+    # Initialize key variables
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--human_file",
+        type=str,
+        required=True,
+        help="Scraper TSV file containing contacts.",
+    )
+
+    # Parse and return
+    args = parser.parse_args()
+    return args
+
+
+if __name__ == "__main__":
+    main()
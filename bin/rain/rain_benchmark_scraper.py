@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Benchmarks fetching RDAP entities from a local rate limited server."""
+
+# Standard imports
+import argparse
+import os
+import sys
+import time
+
+# Try to create a working PYTHONPATH
+_BIN_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+_ROOT_DIRECTORY = os.path.abspath(
+    os.path.join(
+        os.path.abspath(os.path.join(_BIN_DIRECTORY, os.pardir)), os.pardir
+    )
+)
+_EXPECTED = f"{os.sep}potpourri-python{os.sep}bin{os.sep}rain"
+if _BIN_DIRECTORY.endswith(_EXPECTED) is True:
+    sys.path.append(_ROOT_DIRECTORY)
+else:
+    print(
+        f"""\
+This script is not installed in the "{_EXPECTED}" directory. Please fix.\
+"""
+    )
+    sys.exit(2)
+
+
+# Library imports
+from rain.Y2024 import fetcher
+from rain.Y2024 import stub
+
+
+def main():
+    """Main Function."""
+    # Get the CLI arguments
+    args = cli()
+
+    # Time each configuration
+    timings = [
+        ("Sequential", 1, args.rate),
+        (f"Fetcher x{args.workers}", args.workers, args.rate),
+    ]
+    for label, workers, rate in timings:
+        with stub.Server(
+            rate=args.server_rate,
+            latency=args.latency,
+            retry_after=args.retry_after,
+        ) as server:
+            urls = [f"{server.url}/ORG-{_}" for _ in range(args.urls)]
+            fetcher_ = fetcher.Fetcher(workers=workers, rate=rate)
+            start = time.perf_counter()
+            fetched = sum(
+                1 for _ in fetcher_.fetch(urls) if _.data is not None
+            )
+            duration = time.perf_counter() - start
+            final = max(fetcher_.rates().values())
+        print(
+            f"""\
+{label:12}: {duration:8.3f}s {fetched / duration:8.1f} pages/s \
+{fetched:5} fetched {server.requests:5} requests \
+{server.throttled:5} throttled. Final rate {final:.1f}/s"""
+        )
+
+
+def cli():
+    """Parse the CLI.
+
+    Args:
+        args: None
+
+    Returns:
+        args: ArgumentParser
+
+    """
+    # Initialize key variables
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--urls",
+        type=int,
+        default=300,
+        help="Number of entities to fetch.",
+    )
+    parser.add_argument(
+        "--server_rate",
+        type=float,
+        default=40,
+        help="Requests per second the server answers before refusing them.",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.2,
+        help="Seconds the server takes to answer each request.",
+    )
+    parser.add_argument(
+        "--retry_after",
+        type=int,
+        default=1,
+        help="Retry-After seconds sent with refused requests.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=16,
+        help="Number of concurrent requests.",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=0.5,
+        help="Starting requests per second to the server.",
+    )
+
+    # Parse and return
+    args = parser.parse_args()
+    return args
+
+
+if __name__ == "__main__":
+    main()
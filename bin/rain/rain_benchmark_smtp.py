@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""Benchmarks sending email with and without SMTP session reuse."""
+
+# Standard imports
+import argparse
+import os
+import sys
+import time
+
+# Try to create a working PYTHONPATH
+_BIN_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+_ROOT_DIRECTORY = os.path.abspath(
+    os.path.join(
+        os.path.abspath(os.path.join(_BIN_DIRECTORY, os.pardir)), os.pardir
+    )
+)
+_EXPECTED = f"{os.sep}potpourri-python{os.sep}bin{os.sep}rain"
+if _BIN_DIRECTORY.endswith(_EXPECTED) is True:
+    sys.path.append(_ROOT_DIRECTORY)
+else:
+    print(
+        f"""\
+This script is not installed in the "{_EXPECTED}" directory. Please fix.\
+"""
+    )
+    sys.exit(2)
+
+# Library imports
+from rain.Y2024.mailer import Person, MailAuth, Mail, MailServer
+from rain.Y2024.mailer import email as lib_email
+from rain.Y2024.mailer import dispatch
+from rain.Y2024.mailer import stub
+
+
+def main():
+    """Main Function."""
+    # Get the CLI arguments
+    args = cli()
+    auth = MailAuth(username="sender@example.org", password="password")
+    sender = Person(
+        firstname="Sender",
+        lastname="Example",
+        email="sender@example.org",
+        country=None,
+        state=None,
+        individual=True,
+        validated=True,
+        organization=None,
+        organization_updated=None,
+    )
+
+    # Create the emails
+    mails = [
+        Mail(
+            sender=sender,
+            receiver=sender._replace(
+                firstname=f"Person{_}", email=f"person{_}@example.org"
+            ),
+            subject="Benchmark",
+            image=args.image_file,
+            body="<html><body><p>Benchmark message.</p></body></html>",
+        )
+        for _ in range(args.messages)
+    ]
+
+    # Time each method. Zero workers means sending sequentially
+    timings = [
+        ("Session per message", 1, 0),
+        ("Reused session", args.session_limit, 0),
+        (f"Dispatcher x{args.workers}", args.session_limit, args.workers),
+    ]
+    for label, session_limit, workers in timings:
+        with stub.Server(
+            latency=args.latency, delay=args.delay, drop_after=args.drop_after
+        ) as server:
+            host, port = server.address
+            server_ = MailServer(host=host, port=port, starttls=False)
+            start = time.perf_counter()
+            if bool(workers) is False:
+                with lib_email.Sender(
+                    auth, server=server_, session_limit=session_limit
+                ) as sender_:
+                    sent = sum(
+                        1 for _ in mails if sender_.send(_).success is True
+                    )
+                percentiles = ""
+            else:
+                dispatcher = dispatch.Dispatcher(
+                    auth,
+                    server=server_,
+                    workers=workers,
+                    rate=args.rate,
+                    provider_rate=args.provider_rate,
+                    session_limit=session_limit,
+                )
+                dispatcher.dispatch(mails)
+                stats = dispatcher.statistics()
+                sent = stats.sent
+                percentiles = f"""\
+ p50 {stats.p50 * 1000:.1f}ms p90 {stats.p90 * 1000:.1f}ms \
+p99 {stats.p99 * 1000:.1f}ms"""
+            duration = time.perf_counter() - start
+        print(
+            f"""\
+{label:20}: {duration:8.3f}s {sent / duration:8.1f} msg/s \
+{server.sessions:5} sessions {sent:5} sent{percentiles}"""
+        )
+
+
+def cli():
+    """Parse the CLI.
+
+    Args:
+        args: None
+
+    Returns:
+        args: ArgumentParser
+
+    """
+    # Initialize key variables
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--messages",
+        type=int,
+        default=200,
+        help="Number of messages to send.",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.05,
+        help="""\
+Seconds the SMTP server waits before greeting and before accepting a login. \
+This simulates the round trips of connecting to a remote server.""",
+    )
+    parser.add_argument(
+        "--session_limit",
+        type=int,
+        default=100,
+        help="Maximum number of messages per reused session.",
+    )
+    parser.add_argument(
+        "--delay",
+        type=float,
+        default=0.01,
+        help="Seconds the SMTP server takes to accept each message.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Number of concurrent sessions used by the dispatcher.",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=None,
+        help="Maximum messages per second sent by the dispatcher.",
+    )
+    parser.add_argument(
+        "--provider_rate",
+        type=float,
+        default=None,
+        help="Maximum messages per second to each recipient domain.",
+    )
+    parser.add_argument(
+        "--drop_after",
+        type=int,
+        default=None,
+        help="Have the SMTP server drop sessions after this many messages.",
+    )
+    parser.add_argument(
+        "--image_file",
+        type=str,
+        default=None,
+        help="Image to attach to each message.",
+    )
+
+    # Parse and return
+    args = parser.parse_args()
+    return args
+
+
+if __name__ == "__main__":
+    main()
@@ -51,49 +51,36 @@ def main():
     everyone = humans_.complete()
 
     # Filter persons
-    strainer_ = humans.Strainer(everyone)
+    strainer_ = humans.Strainer(
+        everyone, timestamps=humans_.frame()["organization_epoch"]
+    )
     caribbean = strainer_.caribbean()
 
     # Create object for generating emails
-    mailto = lib_email.Mailto(history_file, output_file, args.subject)
-
-    # Process GOATs
-    label(args.output_file, 'Goats')
-    goats = humans.goats(humans_)
-    generator(mailto, goats)
-
-    # Process Caribbean
-    label(args.output_file, 'Caribbean')
-    generator(mailto, caribbean)
-
-    # Process state
-    if bool(args.states) is True:
-        for state in args.states.split(','):
-            # Update the stuff
-            label(args.output_file, state.upper())
-            citizens = strainer_.state(state.upper(), individuals_only=True)
-            generator(mailto, citizens)
+    with lib_email.Mailto(history_file, output_file, args.subject) as mailto:
+        # Process GOATs
+        mailto.label('Goats')
+        goats = humans.goats(humans_)
+        generator(mailto, goats)
+
+        # Process Caribbean
+        mailto.label('Caribbean')
+        generator(mailto, caribbean)
+
+        # Process state
+        if bool(args.states) is True:
+            for state in args.states.split(','):
+                # Update the stuff
+                mailto.label(state.upper())
+                citizens = strainer_.state(
+                    state.upper(), individuals_only=True)
+                generator(mailto, citizens)
 
     # Log stop
     log_message = 'Mailto estimate job complete'
     log.log2debug(3001, log_message)
 
 
-def label(filename, label_):
-    """Add HTML label to file.
-
-    Args:
-        filename: Name of file
-        label_: Label to write
-
-    Returns:
-        None
-    """
-    # Write to output file
-    with open(filename, 'a') as fh_:
-        fh_.write('<br><b>{}</b><br>\n'.format(label_.upper()))
-
-
 def generator(mailto, persons):
     """Generate mailto entries for Person.
 
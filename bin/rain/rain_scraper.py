@@ -1,5 +1,9 @@
 #!/usr/bin/env python3
-"""Scraper."""
+"""Scraper.
+
+Organizations are fetched concurrently, so the output file lists them in the
+order their pages arrive rather than the order of the URLs.
+"""
 
 # Standard imports
 import argparse
@@ -7,9 +11,7 @@ import os
 import sys
 import re
 import json
-import urllib.request
 from collections import namedtuple
-import time
 import random
 import csv
 
@@ -34,6 +36,7 @@ This script is not installed in the "{_EXPECTED}" directory. Please fix.\
 # Library imports
 from rain.Y2024 import log
 from rain.Y2024 import config as _config
+from rain.Y2024 import fetcher
 
 
 class Org:
@@ -230,6 +233,9 @@ def main():
     # Get URLs from file
     filepath = os.path.abspath(os.path.expanduser(args.html_file))
     urls = get_urls(config, filepath)
+    fetcher_ = fetcher.Fetcher(
+        workers=args.workers, rate=args.rate, max_rate=args.max_rate
+    )
 
     # Process Contact
     with open(
@@ -255,8 +261,10 @@ def main():
             ]
         )
 
-        for url in urls:
-            business = get_data(url)
+        # Fetch the organizations concurrently. Rows are written in the
+        # order the pages complete, not the order of the URLs
+        for page in fetcher_.fetch(urls):
+            business = get_data(page)
 
             # Skip if business was invalid
             if bool(business) is False:
@@ -292,50 +300,27 @@ def main():
     log.log2debug(2002, log_message)
 
 
-def get_data(url):
-    """Get data from URL.
+def get_data(page):
+    """Get organization data from a fetched page.
 
     Args:
-        url: URL.
+        page: Page object
 
     Returns:
-        result: URL data
+        result: OrgData object. None if the page couldn't be fetched
 
     """
     # Initialize key variables
     result = None
-    html = None
-    count = 0
-    max_count = 5
 
     # Log
-    log_message = f"Processing {url}"
+    log_message = f"Processing {page.url}"
     log.log2debug(2003, log_message)
 
-    # Retry up to 5 times
-    while count <= max_count:
-        # Loop counter
-        count += 1
-
-        # Conscientious sleep
-        time.sleep(2 + (random.random() * count))
-
-        # Read data
-        try:
-            with urllib.request.urlopen(url) as response:
-                html = response.read()
-
-        except:
-            pass
-
-        # Stop if we get data
-        if bool(html) is True:
-            break
-
     # Process data
-    if bool(html) is True:
+    if bool(page.data) is True:
         # Convert data to dict
-        data = json.loads(html)
+        data = json.loads(page.data)
         org = Org(data)
         result = org.everything()
 
@@ -404,6 +389,26 @@ def cli():
         required=True,
         help="Name of the data source HTML file.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Number of concurrent requests.",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=0.5,
+        help="""\
+Starting requests per second to each server. This rises while the server \
+keeps up and halves when it reports it is overloaded.""",
+    )
+    parser.add_argument(
+        "--max_rate",
+        type=float,
+        default=None,
+        help="Maximum requests per second to each server.",
+    )
 
     # Parse and return
     args = parser.parse_args()
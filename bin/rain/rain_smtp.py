@@ -5,6 +5,8 @@
 import argparse
 import os
 import sys
+import json
+import functools
 
 # PIP imports
 import yaml
@@ -28,8 +30,9 @@ This script is not installed in the "{_EXPECTED}" directory. Please fix.\
     sys.exit(2)
 
 # Library imports
-from rain.Y2024.mailer import Person, MailAuth, Mail
-from rain.Y2024.mailer import email as lib_email
+from rain.Y2024.mailer import Person, MailAuth, Mail, MailServer
+from rain.Y2024.mailer import dispatch
+from rain.Y2024.mailer import outbox
 from rain.Y2024 import log
 from rain.Y2024.mailer import humans
 
@@ -53,8 +56,12 @@ def main():
         firstname=config['firstname'],
         lastname=config['lastname'],
         email=config['username'],
+        country=None,
+        state=None,
         individual=True,
-        validated=True
+        validated=True,
+        organization=None,
+        organization_updated=None
     )
 
     # Get humans
@@ -62,12 +69,6 @@ def main():
         os.path.abspath(os.path.expanduser(args.human_file)))
     recipients = persons.uniques()
 
-    sys.exit(0)
-
-    # See output
-    print(recipients)
-    sys.exit(0)
-
     # Read the email body
     textfile = os.path.abspath(os.path.expanduser(args.html_file))
     with open(textfile) as fh_:
@@ -78,31 +79,130 @@ def main():
 
     # Get authentication information
     auth_ = MailAuth(username=config['username'], password=config['password'])
+    server = MailServer(
+        host=config.get('smtp_host', MailServer().host),
+        port=int(config.get('smtp_port', MailServer().port)),
+        starttls=bool(config.get('starttls', MailServer().starttls))
+    )
 
-    # Send mail to each recipient
-    for recipient in recipients:
-        mail_ = Mail(
-            sender=sender,
-            receiver=recipient,
-            body=body,
-            subject=args.subject,
-            image=imagefile
-        )
-
-        # Send the email
-        result = lib_email.send(auth_, mail_)
-        if bool(result) is True:
-            log_message = 'Successfully sent to {}'.format(recipient.email)
-            log.log2debug(1002, log_message)
+    # Queue each recipient. Messages queued by previous runs keep their state.
+    # Claims must outlast the time taken to send a batch, otherwise another
+    # run could claim and send messages that are still being sent
+    outbox_file = (
+        os.path.abspath(os.path.expanduser(args.outbox_file))
+        if bool(args.outbox_file) else '{}.outbox.db'.format(textfile))
+    lease = _lease(
+        args.batch_size, rate=args.rate, provider_rate=args.provider_rate)
+    with outbox.Outbox(outbox_file, lease=lease) as outbox_:
+        outbox_.add(
+            (_.email, json.dumps(_._asdict())) for _ in recipients)
+        if bool(args.retry_failed) is True:
+            outbox_.retry()
+
+        # Send the queued emails over concurrent sessions. Nothing is sent
+        # without --send, the emails are only queued
+        if bool(args.send) is False:
+            log_message = (
+                'Emails queued but not sent. Run again with --send to send '
+                'them')
+            log.log2warning(1005, log_message)
         else:
-            log_message = 'Failed to send to {}'.format(recipient.email)
-            log.log2debug(1002, log_message)
+            dispatcher = dispatch.Dispatcher(
+                auth_, server=server, workers=args.workers, rate=args.rate,
+                provider_rate=args.provider_rate,
+                session_limit=args.session_limit)
+            while True:
+                envelopes = outbox_.claim(limit=args.batch_size)
+                if bool(envelopes) is False:
+                    break
+
+                # Record each result as soon as it is known, so emails sent
+                # before a crash aren't sent again
+                dispatcher.dispatch(
+                    [
+                        Mail(
+                            sender=sender,
+                            receiver=Person(**json.loads(_.payload)),
+                            body=body,
+                            subject=args.subject,
+                            image=imagefile
+                        ) for _ in envelopes
+                    ],
+                    callback=functools.partial(_record, outbox_, envelopes)
+                )
+
+                # Report throughput and latency
+                stats = dispatcher.statistics()
+                log_message = (
+                    'Sent {} emails, {} failed, in {:.1f}s ({:.1f}/s). '
+                    'Latency p50 {:.3f}s, p90 {:.3f}s, p99 {:.3f}s'.format(
+                        *stats))
+                log.log2debug(1003, log_message)
+
+        # Report the state of the outbox
+        log_message = 'Outbox {}: {}'.format(outbox_file, ', '.join(
+            '{} {}'.format(count, state)
+            for state, count in outbox_.counts().items()))
+        log.log2debug(1004, log_message)
 
     # Log stop
     log_message = 'Mailer job complete'
     log.log2debug(1001, log_message)
 
 
+def _record(outbox_, envelopes, index, delivery):
+    """Record the result of sending an email in the outbox.
+
+    Args:
+        outbox_: outbox.Outbox object
+        envelopes: List of Envelope objects being sent
+        index: Index of the email's Envelope
+        delivery: Delivery object
+
+    Returns:
+        None
+
+    """
+    # Record
+    if bool(delivery.success) is True:
+        outbox_.sent([envelopes[index].id])
+        log_message = 'Successfully sent to {}'.format(
+            delivery.mail.receiver.email)
+        log.log2debug(1002, log_message)
+    else:
+        outbox_.failed(
+            [envelopes[index].id],
+            error=delivery.error or 'SMTP delivery failed')
+        log_message = 'Failed to send to {}'.format(
+            delivery.mail.receiver.email)
+        log.log2debug(1002, log_message)
+
+
+def _lease(batch_size, rate=None, provider_rate=None):
+    """Get the number of seconds to claim a batch of emails for.
+
+    Args:
+        batch_size: Number of emails claimed at a time
+        rate: Maximum emails per second sent by the account. No limit if
+            None or not positive
+        provider_rate: Maximum emails per second sent to each provider. No
+            limit if None or not positive
+
+    Returns:
+        result: Ten minutes, plus twice the time the slowest rate limit needs
+            to send the batch. The whole batch may go to one provider
+
+    """
+    # Initialize key variables
+    result = 600
+    rates = [_ for _ in [rate, provider_rate] if _ is not None and _ > 0]
+
+    # Return
+    if bool(rates) is True:
+        result += 2 * batch_size / min(rates)
+    return result
+
+
 def cli():
     """Parse the CLI.
 
@@ -125,6 +225,42 @@ def cli():
         '--html_file', type=str, required=True)
     parser.add_argument(
         '--human_file', type=str, required=True)
+    parser.add_argument(
+        '--session_limit', type=int, default=100,
+        help='Maximum number of emails to send per SMTP session.')
+    parser.add_argument(
+        '--workers', type=int, default=4,
+        help='Number of concurrent SMTP sessions.')
+    parser.add_argument(
+        '--rate', type=float, default=None,
+        help=(
+            'Maximum emails per second sent by the account. No limit if not '
+            'positive.'))
+    parser.add_argument(
+        '--provider_rate', type=float, default=None,
+        help=(
+            'Maximum emails per second sent to each recipient domain. No '
+            'limit if not positive.'))
+    parser.add_argument(
+        '--outbox_file', type=str, default=None,
+        help=(
+            'SQLite file tracking the delivery of each email. Runs using '
+            'the same file only send emails not already sent. Defaults to '
+            'the html_file name with an ".outbox.db" suffix.'))
+    parser.add_argument(
+        '--batch_size', type=int, default=50,
+        help=(
+            'Number of emails to claim from the outbox at a time. Claims '
+            'last long enough to send the batch at the --rate and '
+            '--provider_rate limits.'))
+    parser.add_argument(
+        '--send', action='store_true',
+        help=(
+            'Send the emails. Without it the emails are only queued in the '
+            'outbox.'))
+    parser.add_argument(
+        '--retry_failed', action='store_true',
+        help='Send emails that failed in previous runs again.')
 
     # Parse and return
     args = parser.parse_args()
@@ -31,6 +31,8 @@ from rain.Y2024.mailer import email as lib_email
 from rain.Y2024 import log
 from rain.Y2024 import misc
 from rain.Y2024.mailer import humans
+from rain.Y2024.mailer import query
+from rain.Y2024.mailer import Query, Segment
 from rain.Y2024 import config as _config
 
 
@@ -60,51 +62,58 @@ def main():
 
     # Get human records
     humans_ = humans.Humans(human_file)
-    everyone = humans_.complete()
-
-    # Filter persons
-    strainer_ = humans.Strainer(everyone)
-
-    # Create object for generating emails
-    thunderbird = lib_email.Thunderbird(
-        campaign,
-        body_file,
-        args.subject,
-        args.sender,
-    )
+    contacts = query.Contacts(humans_.frame())
+    goats = []
+    segments = []
 
     # process Anglophone organizations
     if not args.spanish:
         # Process GOATs
-        people = humans.goats(humans_)
-        thunderbird.generate(people, label="Goats")
-
-        # Process Caribbean
-        people = strainer_.caribbean()
-        thunderbird.generate(people, label="Caribbean")
-
-        # Process Educational
-        people = strainer_.edu(individuals_only=True)
-        thunderbird.generate(people, label="Educational")
-
-        # Process states/provinces with few organizations
-        people = strainer_.smallfry(individuals_only=True, strict=True)
-        thunderbird.generate(people, label="SmallFry")
+        goats = humans.goats(humans_)
+
+        # Process Caribbean, Educational and states/provinces with few
+        # organizations
+        segments.extend(
+            [
+                Segment("Caribbean", Query(countries=humans.CARIBBEAN)),
+                Segment("Educational", Query(individuals_only=True, edu=True)),
+                Segment(
+                    "SmallFry",
+                    Query(individuals_only=True, strict=True, threshold=40),
+                ),
+            ]
+        )
 
     # Process state
     if bool(args.states) is True:
         for state in args.states.split(","):
-            # Update the stuff
-            people = strainer_.state(
-                state.upper(),
-                individuals_only=not bool(args.teams),
-                timestamp=timestamp,
-                strict=True,
-            )
-            thunderbird.generate(
-                people, label=state.upper(), spanish=args.spanish
+            segments.append(
+                Segment(
+                    state.upper(),
+                    Query(
+                        states=[state.upper()],
+                        individuals_only=not bool(args.teams),
+                        updated_after=timestamp,
+                        strict=True,
+                    ),
+                )
             )
 
+    # Create object for generating emails
+    with lib_email.Thunderbird(
+        campaign,
+        body_file,
+        args.subject,
+        args.sender,
+    ) as thunderbird:
+        # Write GOATs first
+        if not args.spanish:
+            thunderbird.generate(goats, label="Goats")
+
+        # Select all segments in a single pass
+        for label, people in contacts.select(segments).items():
+            thunderbird.generate(people, label=label, spanish=args.spanish)
+
     # Log stop
     log_message = "Thunderbird file creation job complete"
     log.log2debug(4001, log_message)
@@ -57,21 +57,19 @@ def main():
     log_message = "Starting Thunderbird file creation job"
     log.log2debug(6000, log_message)
 
-    # Get human records
-    humans_ = humans.SimpleHumans(human_file)
-    everyone = humans_.complete()
+    # Stream human records in bounded chunks
+    everyone = humans.stream(human_file, kind="simple")
 
     # Create object for generating emails
-    thunderbird = lib_email.Thunderbird(
+    with lib_email.Thunderbird(
         campaign,
         body_file,
         args.subject,
         args.sender,
         attachment=attachment,
-    )
-
-    # Process Everyone
-    thunderbird.generate(everyone, label="Everyone Email")
+    ) as thunderbird:
+        # Process Everyone
+        thunderbird.generate(everyone, label="Everyone Email")
 
     # Log stop
     log_message = "Thunderbird file creation job complete"
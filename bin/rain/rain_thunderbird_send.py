@@ -5,8 +5,6 @@
 import argparse
 import os
 import sys
-import subprocess
-import shlex
 
 # Try to create a working PYTHONPATH
 _BIN_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
@@ -29,15 +27,12 @@ This script is not installed in the "{_EXPECTED}" directory. Please fix.\
 # Library imports
 from rain.Y2024 import log
 from rain.Y2024 import config as _config
+from rain.Y2024.mailer import outbox
+from rain.Y2024.mailer import executor
 
 
 def main():
     """Main Function."""
-    # Initialize key variables
-    count = 0
-    interval = 5
-    response = ''
-
     # Get the CLI arguments
     args = cli()
 
@@ -56,23 +51,32 @@ def main():
         lines = fh_.readlines()
     records = [_.strip() for _ in lines if "#" not in _]
 
-    for record in records:
-        count += 1
-        print(count)
-
-        # Process command
-        with subprocess.Popen(
-            shlex.split(record), stdout=subprocess.PIPE, stderr=subprocess.PIPE
-        ) as process:
-            _, __ = process.communicate()
-            _ = process.returncode
-
-        if count % interval == 0:
-            response = input("Press any key to continue...")
-        
-            # Test result
-            if bool(response.strip()) is True:
-                break
+    # Queue the commands. Commands sent by previous runs are skipped
+    with outbox.Outbox(campaign.outbox_file) as outbox_:
+        outbox_.add((_, None) for _ in records)
+        if bool(args.retry_failed) is True:
+            outbox_.retry()
+
+        # Run the commands at the configured pace
+        executor_ = executor.Executor(
+            outbox_,
+            workers=args.workers,
+            per_minute=args.per_minute,
+        )
+        result = executor_.run(
+            limit=args.limit,
+            pause_every=args.pause_every,
+            pause_seconds=args.pause_seconds,
+        )
+
+        # Report progress
+        counts = outbox_.counts()
+        print(
+            f"""\
+Run: {result["sent"]} sent, {result["failed"]} failed. Campaign: \
+{counts[outbox.SENT]} sent, {counts[outbox.FAILED]} failed, \
+{counts[outbox.PENDING] + counts[outbox.IN_FLIGHT]} remaining."""
+        )
 
     # Log stop
     log_message = "Thunderbird sending job complete"
@@ -104,6 +108,46 @@ Thunderbird file to ingest.""",
         type=str,
         help="Name of the configuration file.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Maximum number of Thunderbird commands running at once.",
+    )
+    parser.add_argument(
+        "--per_minute",
+        type=float,
+        default=12,
+        help=(
+            "Maximum number of Thunderbird commands started per minute. "
+            "Commands aren't paced if not positive."
+        ),
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="""\
+Stop after this many commands. The next run continues where this one \
+stopped.""",
+    )
+    parser.add_argument(
+        "--pause_every",
+        type=int,
+        default=None,
+        help="Pause after this many commands.",
+    )
+    parser.add_argument(
+        "--pause_seconds",
+        type=float,
+        default=60,
+        help="Length of each pause in seconds.",
+    )
+    parser.add_argument(
+        "--retry_failed",
+        action="store_true",
+        help="Run commands that failed in previous runs again.",
+    )
 
     # Parse and return
     args = parser.parse_args()
@@ -0,0 +1,6 @@
+"""Global variables for library."""
+
+from collections import namedtuple
+
+Photo = namedtuple("Photo", "filepath metadata digest")
+FileType = namedtuple("FileType", "jpg unsupported")
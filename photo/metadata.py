@@ -0,0 +1,303 @@
+"""Application module to read photo metadata and digests."""
+
+# Standard imports
+import os
+import hashlib
+import functools
+from multiprocessing import get_context
+
+# PIP imports
+from PIL import Image
+from PIL.ExifTags import TAGS
+import piexif
+
+# Library imports
+from photo import Photo, FileType
+
+
+def metadata(filepath, digest=True):
+    """Get the metadata and digest of a file, opening it only once.
+
+    https://exiftool.org/TagNames/EXIF.html has a full list of tags
+
+    Args:
+        filepath: Filepath
+        digest: Calculate the SHA512 digest of the file if True
+
+    Returns:
+        result: Photo object
+
+    """
+    # Results are cached for as long as the file is unchanged
+    stat = os.stat(filepath)
+    result = _cached(
+        os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size, digest
+    )
+    return result
+
+
+def evaluate(filepaths, parallel=False, digest=True):
+    """Get the metadata and digests of many files.
+
+    Args:
+        filepaths: List of filepaths to evaluate
+        parallel: Use parallel processing if True
+        digest: Calculate the SHA512 digest of each file if True
+
+    Returns:
+        results: List of Photo objects
+
+    """
+    # Initialize key variables
+    results = []
+    cores = max(1, int(os.cpu_count() * 0.8))
+
+    # Process the filepaths
+    if bool(parallel) is True and len(filepaths) > 1:
+        with get_context("spawn").Pool(processes=cores) as pool:
+            arguments = [(filepath, digest) for filepath in filepaths]
+            results = pool.starmap(metadata, arguments)
+    else:
+        for filepath in filepaths:
+            results.append(metadata(filepath, digest=digest))
+
+    # Return
+    return results
+
+
+@functools.lru_cache(maxsize=1024)
+def _cached(filepath, mtime, size, digest):
+    """Extract the metadata and digest of a file.
+
+    The file is opened once. PIL only reads the headers it needs from the
+    open file, and the digest is then calculated from chunked reads of the
+    same file, so memory use doesn't grow with the size of the file.
+
+    Args:
+        filepath: Filepath
+        mtime: File modification time in nanoseconds. Used as a cache key
+        size: File size. Used as a cache key
+        digest: Calculate the SHA512 digest of the file if True
+
+    Returns:
+        result: Photo object
+
+    """
+    # Initialize key variables
+    result = {}
+
+    # Process data
+    with open(filepath, "rb") as fh_:
+        with Image.open(fh_) as image:
+            dict_list = _image(image, filepath)
+            dict_list.extend(_zeroth(image))
+            dict_list.extend(_exif(image))
+        hexdigest = _sha512(fh_) if bool(digest) else None
+
+    for item in dict_list:
+        for key, value in item.items():
+            result[key] = value
+
+    # Return
+    return Photo(
+        filepath=filepath,
+        metadata=result,
+        digest=hexdigest,
+    )
+
+
+def sha512(filepath):
+    """Get the HEX digest of file.
+
+    Args:
+        filepath: File path
+
+    Returns:
+        result: Hex digest
+
+    """
+    # Return
+    with open(filepath, "rb") as fh_:
+        result = _sha512(fh_)
+    return result
+
+
+def _sha512(fh_):
+    """Get the HEX digest of an open file from its start.
+
+    Args:
+        fh_: File handle opened in binary mode
+
+    Returns:
+        result: Hex digest
+
+    """
+    # Return
+    hasher = hashlib.sha512()
+    fh_.seek(0)
+    for chunk in iter(lambda: fh_.read(1048576), b""):
+        hasher.update(chunk)
+    result = hasher.hexdigest()
+    return result
+
+
+def _exif(image):
+    """Process exif data.
+
+    https://exiftool.org/TagNames/EXIF.html has a full list of tags
+
+    pprint(TAGS) to get a full list known to the package
+
+    Args:
+        image: PIL Image object
+
+    Returns:
+        result: List of image data dicts
+
+    """
+    # Initialize key variables
+    result = []
+    meta = None
+
+    # Get all Exif. The '0th', '1st' and 'Exif' sections of the spec
+    exifdata = image.info.get("exif")
+    if bool(exifdata):
+        meta = piexif.load(exifdata)
+
+    # Process data
+    if bool(meta) is True:
+        for ifd in ("0th", "Exif", "GPS", "1st"):
+            for tag in meta[ifd]:
+                label = piexif.TAGS[ifd][tag]["name"]
+                value = meta[ifd][tag]
+                if isinstance(value, bytes):
+                    try:
+                        value = value.decode()
+                    except:
+                        continue
+
+                # Fixup
+                if label == "ExposureTime":
+                    value = "{}/{}".format(value[0], value[1])
+                if label == "FNumber":
+                    value = float(value[0] / value[1])
+
+                result.append({label: value})
+
+    # Return
+    return result
+
+
+def _image(image, filepath):
+    """Get basic image data from file.
+
+    Args:
+        image: PIL Image object
+        filepath: Filepath
+
+    Returns:
+        result: List of image data dicts
+
+    """
+    # Initialize key variables
+    result = []
+
+    # Extract image metadata
+    lookup = {
+        "Filename": filepath,
+        "Image Size": image.size,
+        "Image Height": image.height,
+        "Image Width": image.width,
+        "Image Format": image.format,
+        "Image Mode": image.mode,
+        "Image is Animated": getattr(image, "is_animated", False),
+        "Frames in Image": getattr(image, "n_frames", 1),
+    }
+
+    # Process data
+    for label, value in lookup.items():
+        result.append({label: value})
+    return result
+
+
+def _zeroth(image):
+    """Extract a subset of the EXIF data. The '0th' section of the spec.
+
+    https://exiftool.org/TagNames/EXIF.html has a full list of tags
+
+    Args:
+        image: PIL Image object
+
+    Returns:
+        result: List of image data dicts
+
+    """
+    # Initialize key variables
+    result = []
+
+    # Extract a subset of the EXIF data.
+    # The '0th' section of the specification
+    zeroth = image.getexif()
+
+    # Process data
+    for tag_id in zeroth:
+        # Get the tag name, instead of human unreadable tag id
+        tag = TAGS.get(tag_id, tag_id)
+        value = zeroth.get(tag_id)
+
+        # Decode bytes
+        if isinstance(value, bytes):
+            try:
+                value = value.decode()
+            except:
+                value = None
+
+        if bool(value):
+            result.append({"0th {}".format(tag): value})
+
+    return result
+
+
+def valid_file(filepath):
+    """Validate filepath.
+
+    Args:
+        filepath: filepath
+
+    Returns:
+        result: True if a valid file
+
+    """
+    # Initialize key variables
+    result = False
+
+    # Get a list of files
+    if os.path.isfile(filepath) is True:
+        # We are only interested in JPG
+        filetype_ = filetype(filepath)
+        if filetype_.unsupported is False:
+            result = True
+
+    # Return
+    return result
+
+
+def filetype(filepath):
+    """Determine type of file.
+
+    Args:
+        filepath: Name of file
+
+    Returns:
+        result: FileType object
+
+    """
+    # Initialize key variables
+    result = FileType(jpg=False, unsupported=True)
+
+    # Determine the type of file
+    if filepath.lower().endswith(".jpg") is True or (
+        filepath.lower().endswith(".jpeg") is True
+    ):
+        result = FileType(jpg=True, unsupported=False)
+    return result
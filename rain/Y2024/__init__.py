@@ -0,0 +1,5 @@
+"""Global variables for library."""
+
+from collections import namedtuple
+
+Page = namedtuple("Page", "url status data attempts")
@@ -259,5 +259,6 @@ def campaign(config, proposed_name):
         thunderbird_file=f"{file_path_prefix}thunderbird.entries.txt",
         cache_directory=cache_directory,
         campaign=final_name,
+        outbox_file=f"{file_path_prefix}outbox.db",
     )
     return result
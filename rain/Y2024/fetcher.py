@@ -0,0 +1,330 @@
+"""Application module to fetch many URLs concurrently and politely.
+
+Each host gets its own token bucket. Its rate grows additively while
+requests succeed and the bucket is what limits them, and halves whenever
+the host answers 429 or 5xx. Retry-After headers pause all requests to the
+host, so throughput settles at whatever each server allows.
+"""
+
+# Standard imports
+import time
+import http.client
+import random
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Application imports
+from rain.Y2024 import log
+from rain.Y2024 import throttle
+from rain.Y2024 import Page
+
+# HTTP status codes that mean the server is overloaded
+_RETRY = [429, 500, 502, 503, 504]
+
+# Lowest request rate to a host, in requests per second
+_MIN_RATE = 0.05
+
+# Shortest time between rate decreases and slow start increases, in seconds
+_INTERVAL = 1.0
+
+# Longest Retry-After pause honored, in seconds
+_MAX_PAUSE = 600
+
+
+class Fetcher:
+    """Class to fetch URLs with a thread pool and per host rate limits."""
+
+    def __init__(
+        self,
+        workers=8,
+        rate=1.0,
+        max_rate=None,
+        increase=0.1,
+        retries=5,
+        backoff=2.0,
+        timeout=30,
+    ):
+        """Initialize the class.
+
+        Args:
+            workers: Number of concurrent requests
+            rate: Starting requests per second to each host
+            max_rate: Maximum requests per second to each host. No limit if
+                None
+            increase: Requests per second added to the rate of a host after
+                each successful request that had to wait for the rate limit,
+                once the host has reported it is overloaded
+            retries: Number of times to retry a failed request
+            backoff: Seconds to wait before the first retry when the server
+                doesn't send Retry-After. This doubles with each retry
+            timeout: Seconds to wait for each response
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self._workers = max(1, workers)
+        self._rate = max(_MIN_RATE, rate)
+        self._max_rate = max_rate
+        self._increase = increase
+        self._retries = max(0, retries)
+        self._backoff = backoff
+        self._timeout = timeout
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, urls):
+        """Fetch URLs.
+
+        Args:
+            urls: Iterable of URLs
+
+        Returns:
+            result: Generator of Page objects, in the order they complete
+
+        """
+        # Fetch
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            futures = [executor.submit(self.get, _) for _ in urls]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def get(self, url):
+        """Fetch a URL, retrying when the server is overloaded.
+
+        Args:
+            url: URL
+
+        Returns:
+            result: Page object. The data is None if the request failed
+
+        """
+        # Initialize key variables
+        host = self._host(url)
+        data = None
+        status = None
+        attempts = 0
+
+        # Request until successful or out of retries
+        while data is None and attempts <= self._retries:
+            attempts += 1
+            limited = host.wait()
+            pause = None
+
+            try:
+                request = urllib.request.Request(
+                    url, headers={"Accept": "application/rdap+json"}
+                )
+                with urllib.request.urlopen(
+                    request, timeout=self._timeout
+                ) as response:
+                    status = response.status
+                    data = response.read()
+                host.success(limited)
+                break
+            except urllib.error.HTTPError as exception:
+                status = exception.code
+                if status not in _RETRY:
+                    break
+                pause = _retry_after(exception.headers.get("Retry-After"))
+            except (
+                urllib.error.URLError,
+                http.client.HTTPException,
+                ValueError,
+                OSError,
+            ) as exception:
+                status = None
+                log_message = f"Request to {url} failed: {exception}"
+                log.log2debug(2004, log_message)
+
+            # Slow down, then wait for Retry-After or back off
+            host.failure(pause)
+            if pause is None and attempts <= self._retries:
+                time.sleep(
+                    self._backoff
+                    * 2 ** (attempts - 1)
+                    * random.uniform(0.5, 1.5)
+                )
+
+        # Log failures
+        if data is None:
+            log_message = f"""\
+Could not fetch {url} after {attempts} attempts. Status: {status}"""
+            log.log2warning(2005, log_message)
+
+        # Return
+        result = Page(url=url, status=status, data=data, attempts=attempts)
+        return result
+
+    def rates(self):
+        """Get the current request rate to each host.
+
+        Args:
+            None
+
+        Returns:
+            result: Dict of requests per second keyed by host
+
+        """
+        # Return
+        with self._lock:
+            result = {
+                name: host.bucket.rate for name, host in self._hosts.items()
+            }
+        return result
+
+    def _host(self, url):
+        """Get the rate limiting state of the host of a URL.
+
+        Args:
+            url: URL
+
+        Returns:
+            result: _Host object
+
+        """
+        # Return
+        name = urllib.parse.urlsplit(url).netloc.lower()
+        with self._lock:
+            if name not in self._hosts:
+                self._hosts[name] = _Host(
+                    self._rate, self._max_rate, self._increase
+                )
+            result = self._hosts[name]
+        return result
+
+
+class _Host:
+    """Adaptive rate limit for a single host."""
+
+    def __init__(self, rate, max_rate, increase):
+        """Initialize the class.
+
+        Args:
+            rate: Starting requests per second
+            max_rate: Maximum requests per second. No limit if None
+            increase: Requests per second added after each limited success
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.bucket = throttle.TokenBucket(rate, capacity=1)
+        self._max_rate = max_rate
+        self._increase = increase
+        self._resume = 0
+        self._increased = time.monotonic()
+        self._decreased = -_INTERVAL
+        self._slow_start = True
+        self._lock = threading.Lock()
+        self._gate = threading.Lock()
+
+    def wait(self):
+        """Wait until a request may be sent.
+
+        Requests wait their turn one at a time, so each waits at the rate in
+        force when its turn comes rather than the rate when it was queued.
+
+        Args:
+            None
+
+        Returns:
+            result: True if the request had to wait for the rate limit
+
+        """
+        with self._gate:
+            # Wait for any pause requested by the server to end
+            while True:
+                with self._lock:
+                    pause = self._resume - time.monotonic()
+                if pause <= 0:
+                    break
+                time.sleep(pause)
+
+            # Wait for the bucket
+            delay = self.bucket.delay()
+            time.sleep(delay)
+        result = delay > 0
+        return result
+
+    def success(self, limited):
+        """Increase the rate after a successful request.
+
+        Until the host first reports it is overloaded the rate doubles every
+        interval, so it quickly finds the limit of the server. After that it
+        grows additively. The rate only grows when the rate limit is what
+        held requests back, otherwise it would grow without bound while the
+        workers are busy.
+
+        Args:
+            limited: True if the request had to wait for the rate limit
+
+        Returns:
+            None
+
+        """
+        # Update
+        now = time.monotonic()
+        if limited is True:
+            with self._lock:
+                if self._slow_start is False:
+                    rate = self.bucket.rate + self._increase
+                elif now - self._increased >= _INTERVAL:
+                    rate = self.bucket.rate * 2
+                    self._increased = now
+                else:
+                    return
+                if self._max_rate is not None:
+                    rate = min(rate, self._max_rate)
+                self.bucket.update(rate)
+
+    def failure(self, pause=None):
+        """Halve the rate after the server reports it is overloaded.
+
+        Args:
+            pause: Seconds to stop sending requests to the host if not None
+
+        Returns:
+            None
+
+        """
+        # Update. Responses to requests sent before the last decrease don't
+        # reflect it, so the rate is halved at most once per interval
+        now = time.monotonic()
+        with self._lock:
+            if now - self._decreased >= _INTERVAL:
+                self.bucket.update(max(_MIN_RATE, self.bucket.rate / 2))
+                self._decreased = now
+                self._slow_start = False
+            if pause is not None:
+                self._resume = max(self._resume, now + pause)
+
+
+def _retry_after(value):
+    """Convert a Retry-After header to seconds.
+
+    Args:
+        value: Header value. Seconds or an HTTP date
+
+    Returns:
+        result: Seconds to wait. None if there is no valid value
+
+    """
+    # Return
+    if value is None:
+        return None
+    try:
+        result = float(value)
+    except ValueError:
+        try:
+            result = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    result = min(max(0.0, result), _MAX_PAUSE)
+    return result
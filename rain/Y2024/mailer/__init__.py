@@ -9,8 +9,27 @@ organization organization_updated""",
 )
 Mail = namedtuple("Mail", "sender receiver subject image body")
 MailAuth = namedtuple("MailAuth", "username password")
+MailServer = namedtuple(
+    "MailServer",
+    "host port starttls",
+    defaults=("smtp.gmail.com", 587, True),
+)
+Delivery = namedtuple(
+    "Delivery", "mail success attempts latency error", defaults=(None,)
+)
+Outcome = namedtuple("Outcome", "success permanent error")
+Statistics = namedtuple("Statistics", "sent failed duration rate p50 p90 p99")
+Envelope = namedtuple("Envelope", "id key payload attempts")
 
 Campaign = namedtuple(
     "Campaign",
-    "history_file thunderbird_file campaign cache_directory",
+    "history_file thunderbird_file campaign cache_directory outbox_file",
+    defaults=(None,),
+)
+
+Query = namedtuple(
+    "Query",
+    "countries states individuals_only strict updated_after edu threshold",
+    defaults=(None, None, False, False, None, False, None),
 )
+Segment = namedtuple("Segment", "label query")
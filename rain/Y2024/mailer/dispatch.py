@@ -0,0 +1,265 @@
+"""Application module to send many emails concurrently."""
+
+# Standard imports
+import time
+import random
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+# Application imports
+from rain.Y2024 import throttle
+from rain.Y2024.mailer import Delivery, Statistics
+from rain.Y2024.mailer import email as lib_email
+
+
+class Dispatcher:
+    """Class to send emails over many concurrent SMTP sessions."""
+
+    def __init__(
+        self,
+        auth,
+        server=None,
+        workers=4,
+        rate=None,
+        provider_rate=None,
+        retries=3,
+        backoff=1.0,
+        session_limit=100,
+    ):
+        """Initialize the class.
+
+        Args:
+            auth: Namedtuple with Authentication parameters
+            server: MailServer object. Gmail if None
+            workers: Number of concurrent SMTP sessions
+            rate: Maximum emails per second for the account. No limit if
+                None or not positive
+            provider_rate: Maximum emails per second to each recipient email
+                domain. No limit if None or not positive
+            retries: Number of times to retry an email that failed
+                transiently. Emails rejected permanently aren't retried
+            backoff: Seconds to wait before the first retry. This doubles
+                with each retry
+            session_limit: Maximum number of emails to send per session
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self._auth = auth
+        self._server = server
+        self._workers = max(1, workers)
+        self._provider_rate = _rate(provider_rate)
+        self._retries = max(0, retries)
+        self._backoff = backoff
+        self._session_limit = session_limit
+        self._account = (
+            None if _rate(rate) is None else throttle.TokenBucket(rate)
+        )
+        self._providers = {}
+        self._deliveries = []
+        self._duration = 0
+
+    def dispatch(self, mails, callback=None):
+        """Send emails.
+
+        Args:
+            mails: Iterable of Mail objects
+            callback: Function called with the index of each email and its
+                Delivery object as soon as the email is sent or fails
+
+        Returns:
+            result: List of Delivery objects, in the order of the emails
+
+        """
+        # Return
+        result = asyncio.run(self.run(mails, callback=callback))
+        return result
+
+    async def run(self, mails, callback=None):
+        """Send emails from a running event loop.
+
+        Args:
+            mails: Iterable of Mail objects
+            callback: Function called with the index of each email and its
+                Delivery object as soon as the email is sent or fails
+
+        Returns:
+            result: List of Delivery objects, in the order of the emails
+
+        """
+        # Initialize key variables
+        queue = asyncio.Queue()
+        for item in enumerate(mails):
+            queue.put_nowait(item)
+        result = [None] * queue.qsize()
+        start = time.perf_counter()
+
+        # Each worker has its own session, used by one thread at a time
+        senders = [
+            lib_email.Sender(
+                self._auth,
+                server=self._server,
+                session_limit=self._session_limit,
+            )
+            for _ in range(self._workers)
+        ]
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            try:
+                await asyncio.gather(
+                    *[
+                        self._worker(queue, sender, executor, result, callback)
+                        for sender in senders
+                    ]
+                )
+            finally:
+                for sender in senders:
+                    sender.close()
+
+        # Return
+        self._deliveries = result
+        self._duration = time.perf_counter() - start
+        return result
+
+    def statistics(self):
+        """Get the statistics of the last run.
+
+        Args:
+            None
+
+        Returns:
+            result: Statistics object. Latencies are in seconds
+
+        """
+        # Initialize key variables
+        latencies = sorted(_.latency for _ in self._deliveries)
+        sent = sum(1 for _ in self._deliveries if _.success is True)
+
+        # Return
+        result = Statistics(
+            sent=sent,
+            failed=len(self._deliveries) - sent,
+            duration=self._duration,
+            rate=sent / self._duration if bool(self._duration) else 0,
+            p50=_percentile(latencies, 50),
+            p90=_percentile(latencies, 90),
+            p99=_percentile(latencies, 99),
+        )
+        return result
+
+    async def _worker(self, queue, sender, executor, deliveries, callback):
+        """Send emails from the queue until it is empty.
+
+        Args:
+            queue: asyncio.Queue of (index, Mail) tuples
+            sender: email.Sender object
+            executor: Executor to run the blocking sends in
+            deliveries: List of Delivery objects to update at each index
+            callback: Function called with the index and Delivery object of
+                each email. Ignored if None
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        loop = asyncio.get_running_loop()
+
+        # Process the queue
+        while queue.empty() is False:
+            index, mail = queue.get_nowait()
+            start = time.perf_counter()
+            outcome = None
+            attempts = 0
+
+            # Send, retrying transient failures with exponential backoff and
+            # jitter
+            while attempts <= self._retries and (
+                outcome is None
+                or (outcome.success is False and outcome.permanent is False)
+            ):
+                if attempts > 0:
+                    await asyncio.sleep(
+                        self._backoff
+                        * 2 ** (attempts - 1)
+                        * random.uniform(0.5, 1.5)
+                    )
+                attempts += 1
+                await self._throttle(mail)
+                outcome = await loop.run_in_executor(
+                    executor, sender.send, mail
+                )
+
+            deliveries[index] = Delivery(
+                mail=mail,
+                success=outcome.success,
+                attempts=attempts,
+                latency=time.perf_counter() - start,
+                error=outcome.error,
+            )
+            if callback is not None:
+                callback(index, deliveries[index])
+
+    async def _throttle(self, mail):
+        """Wait for the account and provider rate limits.
+
+        Args:
+            mail: Mail object
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        delay = 0
+        provider = mail.receiver.email.split("@")[-1].lower()
+
+        # Get the longest wait
+        if self._account is not None:
+            delay = max(delay, self._account.delay())
+        if self._provider_rate is not None:
+            if provider not in self._providers:
+                self._providers[provider] = throttle.TokenBucket(
+                    self._provider_rate
+                )
+            delay = max(delay, self._providers[provider].delay())
+
+        # Wait
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def _percentile(values, percent):
+    """Get a percentile using the nearest rank method.
+
+    Args:
+        values: Sorted list of values
+        percent: Percentile to get
+
+    Returns:
+        result: Percentile value. 0 if there are no values
+
+    """
+    # Return
+    if bool(values) is False:
+        return 0
+    index = max(0, -(-len(values) * percent // 100) - 1)
+    result = values[min(index, len(values) - 1)]
+    return result
+
+
+def _rate(rate):
+    """Get a rate limit.
+
+    Args:
+        rate: Maximum events per second
+
+    Returns:
+        result: The rate. None if there is no limit because it is None or not
+            positive
+
+    """
+    # Return
+    result = rate if rate is not None and rate > 0 else None
+    return result
@@ -2,20 +2,28 @@
 
 # Standard imports
 import sys
+import ssl
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.image import MIMEImage
+from email.mime.base import MIMEBase
 from email.mime.multipart import MIMEMultipart
 from email.utils import formataddr
 import os
 import uuid
+import functools
+import itertools
+import hashlib
 import tempfile
 import pathlib
 from collections import namedtuple
 
 # Application imports
 from rain.Y2024 import log
+from rain.Y2024.mailer import MailServer, Outcome
 from rain.Y2024.mailer import html
+from rain.Y2024.mailer import history
+from rain.Y2024.mailer import writer
 
 
 class Thunderbird:
@@ -47,32 +55,89 @@ class Thunderbird:
         self._subject = subject
         self._sender = sender
         self._attachment = attachment
+        self._history = history.History(campaign.history_file)
+        self._writer = writer.Writer(campaign.thunderbird_file, self._history)
 
         # Read body_file into a string
         with open(body_file, "r", encoding="utf-8") as fh_:
             self._body = fh_.read()
+        self._template = Template(self._body, campaign.cache_directory)
 
-    def generate(self, persons, label=None, spanish=False):
+    def __enter__(self):
+        """Keep the output and history files open until exit.
+
+        Args:
+            None
+
+        Returns:
+            self: This object
+
+        """
+        # Return
+        self._writer.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Save and close the output and history files.
+
+        Args:
+            exc_type: Exception type
+            exc_value: Exception
+            traceback: Traceback
+
+        Returns:
+            False
+
+        """
+        # Return
+        return self._writer.__exit__(exc_type, exc_value, traceback)
+
+    def checkpoint(self):
+        """Save the output and history files written so far.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Save
+        self._writer.checkpoint()
+
+    def generate(self, persons, label=None, spanish=False, chunksize=10000):
         """Create a thunderbird command file to send emails.
 
+        Persons are processed and saved one chunk at a time, so memory use
+        doesn't grow with the number of persons. Only the first person with
+        each email address is used.
+
         Args:
-            persons: List of person objects
+            persons: Iterable of person objects
             label: Label separator to use between batches of persons
             spanish: True if spanish greeting is required
+            chunksize: Number of persons to process at a time
 
         Returns:
             None
         """
         # Initialize key variables
-        uniques = {}
+        seen = set()
 
-        # Create a unique list of persons
-        for person in persons:
-            uniques[person.email] = person
-        targets = list(uniques.values())
-
-        # Update files
-        self.append(targets, label=label, spanish=spanish)
+        # Prevent other campaign builds from adding the same email addresses
+        with self._writer:
+            if bool(label):
+                self._writer.write([f"# {label.upper()}"])
+
+            # Process each chunk of unique persons, then save it
+            for chunk in _chunks(persons, chunksize):
+                targets = []
+                for person in chunk:
+                    if person.email not in seen:
+                        seen.add(person.email)
+                        targets.append(person)
+                self._append(targets, spanish=spanish)
+                self._writer.checkpoint()
 
     def append(self, persons, label=None, spanish=False):
         """Create a thunderbird command file to send emails.
@@ -83,12 +148,27 @@ class Thunderbird:
             spanish: True if spanish greeting is required
 
 
+        Returns:
+            None
+
+        """
+        # Prevent other campaign builds from adding the same email addresses
+        with self._writer:
+            self._append(persons, label=label, spanish=spanish)
+
+    def _append(self, persons, label=None, spanish=False):
+        """Create a thunderbird command file to send emails.
+
+        Args:
+            persons: List of person objects
+            label: Label separator to use between batches of persons
+            spanish: True if spanish greeting is required
+
         Returns:
             None
 
         """
         # Initialize key variables
-        emails = []
         valids = []
         lines = []
 
@@ -98,20 +178,13 @@ class Thunderbird:
         else:
             attachment = ""
 
-        # Get emails previously sent
-        if os.path.isfile(self._campaign.history_file) is True:
-            with open(
-                self._campaign.history_file, "r", encoding="utf-8"
-            ) as fh_:
-                emails = [_.strip() for _ in fh_.readlines()]
-
         # Filter emails
         for person in persons:
             # Don't prepare to send email to obvious support address
             if _support(person) is True:
                 continue
 
-            if person.email not in emails:
+            if person.email not in self._history:
                 valids.append(person)
 
         # Create mailto links
@@ -131,15 +204,8 @@ class Thunderbird:
                     else f"Estimado {person.firstname}"
                 )
 
-            # Create a temporary file with the email body
-            with tempfile.NamedTemporaryFile(
-                mode="w",
-                delete=False,
-                suffix=".html",
-                dir=self._campaign.cache_directory,
-            ) as fh_:
-                fh_.write(f"{self._body.replace('XXXXXXXXXX', greeting)}")
-                filepath = pathlib.Path(fh_.name)
+            # Get the file with the email body for the greeting
+            filepath = self._template.filepath(greeting)
 
             # Create entry for output file
             command = f"""\
@@ -152,23 +218,78 @@ message='{filepath}'\
 """
             lines.append(command)
 
-        # Write to output file
-        with open(
-            self._campaign.thunderbird_file, "a", encoding="utf-8"
-        ) as fh_:
+        # Write the Thunderbird command entries and update the history
+        if bool(label):
+            self._writer.write([f"# {label.upper()}"])
+        self._writer.write(lines, emails=[_.email for _ in valids])
 
-            # Write the Thunderbird command entries
-            if bool(label):
-                fh_.write(f"# {label.upper()}\n")
 
-            # Write the Thunderbird command entries
-            for line in lines:
-                fh_.write(f"{line}\n")
+class Template:
+    """Class to create email body files from a template."""
+
+    def __init__(self, body, directory, placeholder="XXXXXXXXXX"):
+        """Initialize the class.
+
+        Args:
+            body: Email body with placeholders for the greeting
+            directory: Directory in which to create body files
+            placeholder: Placeholder string to replace with the greeting
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self._parts = body.split(placeholder)
+        self._directory = directory
+        self._filepaths = {}
+
+    def render(self, greeting):
+        """Create an email body.
+
+        Args:
+            greeting: Greeting to use in place of the placeholder
+
+        Returns:
+            result: Email body
+
+        """
+        # Return
+        result = greeting.join(self._parts)
+        return result
+
+    def filepath(self, greeting):
+        """Get the file containing the email body for a greeting.
+
+        Files are named after the hash of their contents, so each distinct
+        body is only written once, however many persons share the greeting.
+
+        Args:
+            greeting: Greeting to use in place of the placeholder
+
+        Returns:
+            result: pathlib.Path of the body file
+
+        """
+        # Use the file created previously
+        if greeting in self._filepaths:
+            return self._filepaths[greeting]
+
+        # Create the file if it doesn't already exist
+        body = self.render(greeting).encode("utf-8")
+        result = pathlib.Path(self._directory).joinpath(
+            f"{hashlib.sha256(body).hexdigest()}.html"
+        )
+        if result.is_file() is False:
+            with tempfile.NamedTemporaryFile(
+                delete=False, suffix=".tmp", dir=self._directory
+            ) as fh_:
+                fh_.write(body)
+            os.replace(fh_.name, result)
 
-        # Write to history file
-        with open(self._campaign.history_file, "a", encoding="utf-8") as fh_:
-            for person in valids:
-                fh_.write(f"{person.email}\n")
+        # Return
+        self._filepaths[greeting] = result
+        return result
 
 
 class Mailto:
@@ -187,10 +308,66 @@ class Mailto:
 
         """
         # Initialize key variables
-        self._history = history_file
-        self._output = output_file
+        self._history = history.History(history_file)
+        self._writer = writer.Writer(output_file, self._history)
         self._subject = subject
 
+    def __enter__(self):
+        """Keep the output and history files open until exit.
+
+        Args:
+            None
+
+        Returns:
+            self: This object
+
+        """
+        # Return
+        self._writer.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Save and close the output and history files.
+
+        Args:
+            exc_type: Exception type
+            exc_value: Exception
+            traceback: Traceback
+
+        Returns:
+            False
+
+        """
+        # Return
+        return self._writer.__exit__(exc_type, exc_value, traceback)
+
+    def checkpoint(self):
+        """Save the output and history files written so far.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Save
+        self._writer.checkpoint()
+
+    def label(self, label_):
+        """Add HTML label to the output file.
+
+        Args:
+            label_: Label to write
+
+        Returns:
+            None
+
+        """
+        # Write to output file
+        with self._writer:
+            self._writer.write([f"<br><b>{label_.upper()}</b><br>"])
+
     def append(self, persons):
         """Send mail.
 
@@ -198,23 +375,31 @@ class Mailto:
             persons: List of person objects
 
 
+        Returns:
+            None
+
+        """
+        # Prevent other campaign builds from adding the same email addresses
+        with self._writer:
+            self._append(persons)
+
+    def _append(self, persons):
+        """Send mail.
+
+        Args:
+            persons: List of person objects
+
         Returns:
             None
 
         """
         # Initialize key variables
-        emails = []
         valids = []
         links = []
 
-        # Get emails previously sent
-        if os.path.isfile(self._history) is True:
-            with open(self._history, "r", encoding="utf-8") as fh_:
-                emails = [_.strip() for _ in fh_.readlines()]
-
         # Filter emails
         for person in persons:
-            if person.email not in emails:
+            if person.email not in self._history:
                 valids.append(person)
 
         # Create mailto links
@@ -239,100 +424,363 @@ subject={'%20'.join(self._subject.split())}&body={greeting}%2C%0A">\
 """
             )
 
-        # Write to output file
-        with open(self._output, "a", encoding="utf-8") as fh_:
-            for link in links:
-                fh_.write(f"{link}\n")
+        # Write to output file and update the history
+        self._writer.write(links, emails=[_.email for _ in valids])
 
-        # Write to history file
-        with open(self._history, "a", encoding="utf-8") as fh_:
-            for person in valids:
-                fh_.write(f"{person.email}\n")
 
+class Sender:
+    """Class to send many emails over a reusable SMTP session."""
 
-def send(auth, mail):
+    def __init__(self, auth, server=None, session_limit=100, timeout=60):
+        """Initialize the class.
+
+        The session is opened when the first email is sent, and is reopened
+        if the server drops it or after session_limit emails.
+
+        Args:
+            auth: Namedtuple with Authentication parameters
+            server: MailServer object. Gmail if None
+            session_limit: Maximum number of emails to send per session
+            timeout: Socket timeout in seconds
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self._auth = auth
+        self._server = MailServer() if server is None else server
+        self._session_limit = max(1, session_limit)
+        self._timeout = timeout
+        self._client = None
+        self._count = 0
+        self.sessions = 0
+
+    def __enter__(self):
+        """Enter the context.
+
+        Args:
+            None
+
+        Returns:
+            self: This object
+
+        """
+        # Return
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the session.
+
+        Args:
+            exc_type: Exception type
+            exc_value: Exception
+            traceback: Traceback
+
+        Returns:
+            False
+
+        """
+        # Return
+        self.close()
+        return False
+
+    def send(self, mail):
+        """Send mail.
+
+        Failures are permanent when the server rejects the email with a 5xx
+        reply, for example for unknown recipients. Sending the same email
+        again won't succeed. Other failures, such as 4xx replies, dropped
+        sessions and socket errors, are transient.
+
+        Args:
+            mail: Namedtuple with mail contents
+
+        Returns:
+            result: Outcome object
+
+        """
+        # Initialize key variables
+        success = False
+        permanent = False
+        error = None
+        message = _message(mail).as_string()
+
+        # Send, reconnecting once if the server dropped the session
+        for attempt in range(2):
+            if self._connect() is False:
+                error = "Could not open an SMTP session"
+                break
+            try:
+                self._client.sendmail(
+                    mail.sender.email, mail.receiver.email, message
+                )
+                self._count += 1
+                success = True
+                break
+            except:
+                _exception = sys.exc_info()
+                permanent = _permanent(_exception[1])
+                error = str(_exception[1])
+
+                # SMTP errors other than disconnections leave the session
+                # usable. Socket errors don't
+                if isinstance(
+                    _exception[1], smtplib.SMTPServerDisconnected
+                ) or not isinstance(_exception[1], smtplib.SMTPException):
+                    self.close()
+                    if attempt == 0:
+                        continue
+
+                log_message = "SMTP Send Failure"
+                log.log2exception(1015, _exception, message=log_message)
+                break
+
+        # Return
+        result = Outcome(success=success, permanent=permanent, error=error)
+        return result
+
+    def close(self):
+        """Close the session.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Close
+        if self._client is not None:
+            try:
+                self._client.quit()
+            except:
+                self._client.close()
+        self._client = None
+        self._count = 0
+
+    def _connect(self):
+        """Open an authenticated session if required.
+
+        Args:
+            None
+
+        Returns:
+            success: True if a session is open
+
+        """
+        # Reuse the session until it reaches its limit
+        if self._client is not None:
+            if self._count < self._session_limit:
+                return True
+            self.close()
+
+        # Create SMTP session
+        try:
+            client = smtplib.SMTP(
+                self._server.host, self._server.port, timeout=self._timeout
+            )
+            client.ehlo()
+            if bool(self._server.starttls) is True:
+                client.starttls(context=ssl.create_default_context())
+                client.ehlo()
+        except:
+            _exception = sys.exc_info()
+            log_message = "SMTP Communication Failure"
+            log.log2exception(1013, _exception, message=log_message)
+            return False
+
+        # Authentication
+        try:
+            client.login(self._auth.username, self._auth.password)
+        except:
+            _exception = sys.exc_info()
+            log_message = "SMTP Authentication Failure"
+            log.log2exception(1014, _exception, message=log_message)
+            client.close()
+            return False
+
+        # Return
+        self._client = client
+        self.sessions += 1
+        return True
+
+
+def send(auth, mail, server=None):
     """Send mail.
 
     Args:
         auth: Namedtuple with Authentication parameters
         mail: Namedtuple with mail contents
+        server: MailServer object. Gmail if None
 
     Returns:
         success: True if succesful
 
     """
-    # Short circuit
-    return False
+    # Send over a single use session
+    with Sender(auth, server=server, session_limit=1) as sender:
+        success = sender.send(mail).success
+    return success
 
-    # Initialize key variables
-    success = False
-    content_id = str(uuid.uuid4())
-    firstname = (
-        mail.receiver.firstname if bool(mail.receiver.firstname) else "Hello"
-    )
-
-    # Create SMTP TLS session
-    client = smtplib.SMTP("smtp.gmail.com", 587)
-    try:
-        client.ehlo()
-    except:
-        _exception = sys.exc_info()
-        log_message = "Gmail Communication Failure"
-        log.log2exception(1013, _exception, message=log_message)
-    client.starttls()
-
-    # Authentication
-    try:
-        client.login(auth.username, auth.password)
-    except:
-        _exception = sys.exc_info()
-        log_message = "Gmail Authentication Failure"
-        log.log2exception(1014, _exception, message=log_message)
-        return success
-
-    # Format message
-    message = MIMEMultipart()
-    message["Subject"] = mail.subject
-    message["From"] = _address(mail.sender)
-    message["To"] = _address(mail.receiver)
-
-    # Format body
-    html_ = f"""
+
+class Factory:
+    """Class to create MIME messages for many recipients of one email."""
+
+    def __init__(self, sender, subject, body, image=None):
+        """Initialize the class.
+
+        The body is sanitized and the image is read and encoded only once.
+
+        Args:
+            sender: Person object of the sender
+            subject: Subject of email
+            body: HTML body of email
+            image: Name of image file to show inline after the body
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self._subject = subject
+        self._from = _address(sender)
+        self._body = html.File(body, parser="stream").body()
+        self._image = None
+
+        # Encode the image
+        if bool(image) is True:
+            with open(image, "rb") as fh_:
+                part = MIMEImage(fh_.read())
+            self._image = (part.get_content_subtype(), part.get_payload())
+
+    def message(self, receiver):
+        """Create the MIME message for a recipient.
+
+        Args:
+            receiver: Person object of the recipient
+
+        Returns:
+            message: MIMEMultipart object
+
+        """
+        # Initialize key variables
+        content_id = str(uuid.uuid4())
+        firstname = receiver.firstname if bool(receiver.firstname) else "Hello"
+
+        # Format message
+        message = MIMEMultipart()
+        message["Subject"] = self._subject
+        message["From"] = self._from
+        message["To"] = _address(receiver)
+
+        # Format body
+        html_ = f"""
 <html>
     <head></head>
     <body>
         <font face="arial">
         <p>{firstname},</p>
-            {html.File(mail.body).body()}
+            {self._body}
         <br/><img src="cid:{content_id}"/>
         </font>
     </body>
 </html>
 """
 
-    message.attach(MIMEText(html_, "html", "UTF-8"))
+        message.attach(MIMEText(html_, "html", "UTF-8"))
 
-    # Add attachment if required
-    if bool(mail.image) is True:
-        with open(mail.image, "rb") as fh_:
-            part = MIMEImage(fh_.read())
+        # Add the encoded image if required
+        if self._image is not None:
+            part = MIMEBase("image", self._image[0])
+            part.set_payload(self._image[1])
+            part["Content-Transfer-Encoding"] = "base64"
             part.add_header("Content-ID", f"<{content_id}>")
-        message.attach(part)
+            message.attach(part)
 
-    # Send
-    try:
-        client.sendmail(
-            mail.sender.email, mail.receiver.email, message.as_string()
-        )
-        success = True
-    except:
-        _exception = sys.exc_info()
-        log_message = "Gmail Send Failure"
-        log.log2exception(1015, _exception, message=log_message)
-        return success
-    finally:
-        client.quit()
-    return success
+        # Return
+        return message
+
+
+def _message(mail):
+    """Create the MIME message for an email.
+
+    Args:
+        mail: Namedtuple with mail contents
+
+    Returns:
+        message: MIMEMultipart object
+
+    """
+    # Return
+    message = _factory(
+        mail.sender,
+        mail.subject,
+        mail.body,
+        mail.image,
+        os.stat(mail.image).st_mtime_ns if bool(mail.image) else None,
+    ).message(mail.receiver)
+    return message
+
+
+@functools.lru_cache(maxsize=16)
+def _factory(sender, subject, body, image, mtime):
+    """Get the Factory for an email, creating it only once.
+
+    Args:
+        sender: Person object of the sender
+        subject: Subject of email
+        body: HTML body of email
+        image: Name of image file to show inline after the body
+        mtime: Modification time of the image file. Used as a cache key
+
+    Returns:
+        result: Factory object
+
+    """
+    # Return
+    result = Factory(sender, subject, body, image=image)
+    return result
+
+
+def _permanent(exception):
+    """Determine whether an SMTP error means the email can never be sent.
+
+    Args:
+        exception: Exception raised while sending
+
+    Returns:
+        result: True if the server rejected the email with a 5xx reply
+
+    """
+    # Recipients refused with 4xx replies, such as greylisting, may succeed
+    if isinstance(exception, smtplib.SMTPRecipientsRefused):
+        codes = [_[0] for _ in exception.recipients.values()]
+        result = bool(codes) and all(500 <= _ < 600 for _ in codes)
+    elif isinstance(exception, smtplib.SMTPResponseException):
+        result = 500 <= exception.smtp_code < 600
+    else:
+        result = False
+    return result
+
+
+def _chunks(items, size):
+    """Split an iterable into lists.
+
+    Args:
+        items: Iterable
+        size: Maximum length of each list
+
+    Returns:
+        None
+
+    """
+    # Process
+    iterator = iter(items)
+    chunk = list(itertools.islice(iterator, max(1, size)))
+    while bool(chunk) is True:
+        yield chunk
+        chunk = list(itertools.islice(iterator, max(1, size)))
 
 
 def _support(person):
@@ -0,0 +1,144 @@
+"""Application module to run queued Thunderbird commands at a steady pace."""
+
+# Standard imports
+import time
+import shlex
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Application imports
+from rain.Y2024 import log
+from rain.Y2024 import throttle
+
+
+class Executor:
+    """Class to run the commands in an outbox with bounded concurrency."""
+
+    def __init__(self, outbox_, workers=1, per_minute=12, timeout=300):
+        """Initialize the class.
+
+        Commands are claimed from the outbox only when they are about to
+        run, and their results are recorded in it as they finish, so the
+        outbox is a durable record of progress.
+
+        Args:
+            outbox_: outbox.Outbox object of commands to run
+            workers: Maximum number of commands running at the same time
+            per_minute: Maximum number of commands started per minute.
+                Commands aren't paced if None or not positive
+            timeout: Seconds to wait for a command before it fails
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self._outbox = outbox_
+        self._workers = max(1, workers)
+        self._timeout = timeout
+        self._bucket = (
+            throttle.TokenBucket(per_minute / 60, capacity=1)
+            if per_minute is not None and per_minute > 0
+            else None
+        )
+
+    def run(self, limit=None, pause_every=None, pause_seconds=0):
+        """Run queued commands.
+
+        Args:
+            limit: Maximum number of commands to run. All if None
+            pause_every: Wait for running commands to finish and pause after
+                this many commands if not None
+            pause_seconds: Length of each pause in seconds
+
+        Returns:
+            result: Dict of the number of commands sent and failed
+
+        """
+        # Initialize key variables
+        result = {"sent": 0, "failed": 0}
+        count = 0
+        running = set()
+
+        # Start commands until the outbox is empty or the limit is reached
+        with ThreadPoolExecutor(max_workers=self._workers) as pool:
+            try:
+                while limit is None or count < limit:
+                    # Keep at most one command running per worker
+                    if len(running) >= self._workers:
+                        done, running = wait(
+                            running, return_when=FIRST_COMPLETED
+                        )
+                        _tally(result, done)
+
+                    # Pause
+                    if bool(pause_every) is True and (
+                        count > 0 and count % pause_every == 0
+                    ):
+                        _tally(result, wait(running).done)
+                        running = set()
+                        time.sleep(pause_seconds)
+
+                    # Claim the next command when it may start
+                    if self._bucket is not None:
+                        self._bucket.acquire()
+                    envelopes = self._outbox.claim()
+                    if bool(envelopes) is False:
+                        break
+                    running.add(pool.submit(self._execute, envelopes[0]))
+                    count += 1
+            finally:
+                _tally(result, wait(running).done)
+
+        # Return
+        return result
+
+    def _execute(self, envelope):
+        """Run a command and record the result in the outbox.
+
+        Args:
+            envelope: Envelope object. The key is the command
+
+        Returns:
+            success: True if successful
+
+        """
+        # Run
+        try:
+            process = subprocess.run(
+                shlex.split(envelope.key),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                timeout=self._timeout,
+                check=False,
+            )
+            success = process.returncode == 0
+            error = process.stderr.decode("utf-8", "replace").strip()
+        except (OSError, subprocess.SubprocessError) as exception:
+            success = False
+            error = str(exception)
+
+        # Record the result
+        if success is True:
+            self._outbox.sent([envelope.id])
+        else:
+            self._outbox.failed([envelope.id], error=error)
+            log_message = f"Command failed: {envelope.key}: {error}"
+            log.log2warning(5002, log_message)
+        return success
+
+
+def _tally(result, futures):
+    """Count the results of finished commands.
+
+    Args:
+        result: Dict of the number of commands sent and failed to update
+        futures: Iterable of finished futures of Executor._execute
+
+    Returns:
+        None
+
+    """
+    # Count
+    for future in futures:
+        result["sent" if future.result() is True else "failed"] += 1
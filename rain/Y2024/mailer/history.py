@@ -0,0 +1,194 @@
+"""Application module to track the email addresses already contacted."""
+
+# Standard imports
+import os
+import fcntl
+import contextlib
+
+
+class History:
+    """Append only file of email addresses with an in memory index."""
+
+    def __init__(self, filename):
+        """Initialize the class.
+
+        The file has one email address per line and is only read once. Lines
+        appended by other processes are read at the start of each
+        transaction.
+
+        Args:
+            filename: Name of history file
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self._filename = filename
+        self._emails = set()
+        self._offset = 0
+        self._staged = []
+        self._depth = 0
+        self._newline = True
+        self._fh = None
+
+        # Read the file
+        if os.path.isfile(filename) is True:
+            with open(filename, "rb") as fh_:
+                self._read(fh_)
+
+    def __contains__(self, email):
+        """Determine whether an email address is in the history.
+
+        Args:
+            email: Email address
+
+        Returns:
+            result: True if present
+
+        """
+        # Return
+        result = email in self._emails
+        return result
+
+    def __len__(self):
+        """Get the number of email addresses in the history.
+
+        Args:
+            None
+
+        Returns:
+            result: Number of email addresses
+
+        """
+        # Return
+        result = len(self._emails)
+        return result
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Lock the history file while adding email addresses.
+
+        The history is refreshed with addresses written by other processes
+        once the lock is held. Addresses added inside the transaction are
+        written to the file in one batch when it completes, or earlier by
+        commit(), and discarded if it fails. Nested transactions are part of
+        the outermost one.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Nested transactions
+        if self._depth > 0:
+            self._depth += 1
+            try:
+                yield self
+            finally:
+                self._depth -= 1
+            return
+
+        # Outermost transaction
+        with open(self._filename, "a+b") as fh_:
+            fcntl.flock(fh_, fcntl.LOCK_EX)
+            self._fh = fh_
+            self._depth = 1
+            try:
+                self._read(fh_)
+                yield self
+                self.commit()
+            except:
+                self.rollback()
+                raise
+            finally:
+                self._fh = None
+                self._depth = 0
+                fcntl.flock(fh_, fcntl.LOCK_UN)
+
+    def commit(self):
+        """Write the email addresses added in the current transaction.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Nothing to do
+        if bool(self._staged) is False or self._fh is None:
+            return
+
+        # Write the staged email addresses
+        lines = "".join(f"{_}\n" for _ in self._staged)
+        if self._newline is False:
+            lines = f"\n{lines}"
+        self._fh.write(lines.encode("utf-8"))
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self._offset = self._fh.tell()
+        self._newline = True
+        self._staged = []
+
+    def rollback(self):
+        """Discard the email addresses added in the current transaction.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Discard
+        self._emails.difference_update(self._staged)
+        self._staged = []
+
+    def add(self, emails):
+        """Add many email addresses to the history.
+
+        Args:
+            emails: Iterable of email addresses
+
+        Returns:
+            result: List of the email addresses that were not already in the
+                history, in their original order
+
+        """
+        # Initialize key variables
+        result = []
+
+        # Add the new addresses
+        with self.transaction():
+            for email in emails:
+                if email not in self._emails:
+                    self._emails.add(email)
+                    result.append(email)
+            self._staged.extend(result)
+
+        # Return
+        return result
+
+    def _read(self, fh_):
+        """Read the email addresses added since the last read.
+
+        Args:
+            fh_: Binary file handle of the history file
+
+        Returns:
+            None
+
+        """
+        # Read from the last known position
+        fh_.seek(self._offset)
+        data = fh_.read()
+        for line in data.decode("utf-8").splitlines():
+            email = line.strip()
+            if bool(email) is True:
+                self._emails.add(email)
+        self._offset += len(data)
+        if bool(data) is True:
+            self._newline = data.endswith(b"\n")
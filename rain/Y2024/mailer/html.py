@@ -1,27 +1,58 @@
 """Application module to manage html in email."""
 
 # Standard imports
+import hashlib
+import threading
+import collections
+from html import escape
+
+# PIP imports
 from bs4 import BeautifulSoup
+from lxml import etree
+
+# Attributes removed from all tags
+_ATTRIBUTES = ['class', 'id', 'name', 'style']
+
+# Tags without content or end tags
+_VOID = [
+    'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed',
+    'frame', 'hr', 'image', 'img', 'input', 'isindex', 'keygen', 'link',
+    'menuitem', 'meta', 'nextid', 'param', 'source', 'spacer', 'track', 'wbr'
+]
+
+# Tags whose text is written without escaping
+_RAW = ['script', 'style']
+
+# Bodies created previously, keyed by the hash of the HTML and the parser.
+# Emails are sent from many threads, so the cache is only used with the lock
+_CACHE = collections.OrderedDict()
+_CACHE_SIZE = 32
+_LOCK = threading.Lock()
 
 
 class File():
     """Class to manipulate HTML file data."""
 
-    def __init__(self, html):
+    def __init__(self, html, parser='lxml'):
         """Initialize the class.
 
         Args:
             html: HTML code
+            parser: 'lxml' or 'html.parser' to sanitize a BeautifulSoup tree.
+                'stream' to sanitize while lxml parses, without creating a
+                tree. This is much faster and gives the same result as 'lxml'
 
         Returns:
             None
 
         """
         # Initialize key variables
-        self._soup = BeautifulSoup(html, features='lxml')
-        for tag in self._soup():
-            for attribute in ['class', 'id', 'name', 'style']:
-                del tag[attribute]
+        self._html = html
+        self._parser = parser
+        self._key = (
+            hashlib.sha256(html.encode('utf-8', 'replace')).hexdigest(),
+            parser
+        )
 
     def body(self):
         """Get body from HTML.
@@ -33,13 +64,24 @@ class File():
             result: Body HTML
 
         """
+        # Use the body created previously
+        with _LOCK:
+            if self._key in _CACHE:
+                _CACHE.move_to_end(self._key)
+                return _CACHE[self._key]
+
+        # Get the serialized children of the body
+        if self._parser == 'stream':
+            children = etree.HTML(
+                self._html, etree.HTMLParser(target=_Stream()))
+        else:
+            children = _children(self._html, self._parser)
+
         # Return result
         items = []
-        body = self._soup.find('body')
-
-        for item_ in body.findChildren(recursive=False):
+        for item_ in children:
             # Replace carriage returns with spaces
-            item = ' '.join(str(item_).split('\n'))
+            item = ' '.join(item_.split('\n'))
 
             # Remove duplicate white space
             item = ' '.join(item.split())
@@ -50,4 +92,198 @@ class File():
 
         # Strip </br> and return
         result = ''.join(items).replace('<p><br/></p>', '')
+
+        # Update the cache
+        with _LOCK:
+            _CACHE[self._key] = result
+            if len(_CACHE) > _CACHE_SIZE:
+                _CACHE.popitem(last=False)
+        return result
+
+
+def _children(html, parser):
+    """Serialize the tags in the HTML body using BeautifulSoup.
+
+    Args:
+        html: HTML code
+        parser: BeautifulSoup parser
+
+    Returns:
+        result: List of HTML strings. One per child tag of the body
+
+    """
+    # Remove unwanted attributes
+    soup = BeautifulSoup(html, features=parser)
+    for tag in soup():
+        for attribute in _ATTRIBUTES:
+            del tag[attribute]
+
+    # Return
+    body = soup.find('body')
+    result = [str(_) for _ in body.findChildren(recursive=False)]
+    return result
+
+
+class _Stream():
+    """lxml parser target that serializes the tags in the HTML body.
+
+    lxml calls its methods for each parsing event without creating a tree.
+    The output matches BeautifulSoup's: unwanted attributes are removed,
+    attributes are sorted, void tags are self closed, and text and attribute
+    values are escaped.
+    """
+
+    def __init__(self):
+        """Initialize the class.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self._items = []
+        self._parts = []
+        self._stack = []
+        self._body = False
+
+    def start(self, tag, attrib):
+        """Process start tags.
+
+        Args:
+            tag: Tag name
+            attrib: Dict of attributes
+
+        Returns:
+            None
+
+        """
+        # Skip tags outside the body
+        if tag == 'body':
+            self._body = True
+            return
+        if self._body is False:
+            return
+
+        # Remove unwanted attributes
+        attributes = ''.join(
+            ' {}={}'.format(name, _quote(value))
+            for name, value in sorted(attrib.items())
+            if name not in _ATTRIBUTES
+        )
+
+        # Write the tag
+        if tag in _VOID:
+            self._parts.append('<{}{}/>'.format(tag, attributes))
+            if bool(self._stack) is False:
+                self._item()
+        else:
+            self._parts.append('<{}{}>'.format(tag, attributes))
+            self._stack.append(tag)
+
+    def end(self, tag):
+        """Process end tags.
+
+        Args:
+            tag: Tag name
+
+        Returns:
+            None
+
+        """
+        # Skip tags outside the body and void tags
+        if tag == 'body':
+            self._body = False
+        if tag in _VOID or bool(self._stack) is False:
+            return
+
+        # Close the tag
+        self._stack.pop()
+        self._parts.append('</{}>'.format(tag))
+        if bool(self._stack) is False:
+            self._item()
+
+    def data(self, data):
+        """Process text.
+
+        Args:
+            data: Text
+
+        Returns:
+            None
+
+        """
+        # Text directly in the body isn't part of any child tag
+        if bool(self._stack) is True:
+            if self._stack[-1] in _RAW:
+                self._parts.append(data)
+            else:
+                self._parts.append(escape(data, quote=False))
+
+    def comment(self, text):
+        """Process comments.
+
+        Args:
+            text: Comment
+
+        Returns:
+            None
+
+        """
+        # Keep comments in child tags
+        if bool(self._stack) is True:
+            self._parts.append('<!--{}-->'.format(text))
+
+    def close(self):
+        """Get the result of parsing.
+
+        Args:
+            None
+
+        Returns:
+            result: List of HTML strings. One per child tag of the body
+
+        """
+        # Return
+        result = self._items
         return result
+
+    def _item(self):
+        """Save the child tag written so far.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Save
+        self._items.append(''.join(self._parts))
+        self._parts = []
+
+
+def _quote(value):
+    """Quote an attribute value the way BeautifulSoup does.
+
+    Args:
+        value: Attribute value
+
+    Returns:
+        result: Quoted value
+
+    """
+    # Attributes without values are empty strings
+    value = escape('' if value is None else value, quote=False)
+
+    # Use single quotes when the value contains only double quotes
+    if '"' in value:
+        if "'" in value:
+            result = '"{}"'.format(value.replace('"', '&quot;'))
+        else:
+            result = "'{}'".format(value)
+    else:
+        result = '"{}"'.format(value)
+    return result
@@ -1,15 +1,62 @@
 """Application module to manage human file management."""
 
 # Standard imports
+import os
 import re
+import tempfile
 
 # PIP imports
+import numpy as np
 import pandas as pd
 
 # Library imports
 from rain.Y2024.mailer import Person
 from rain.Y2024 import misc
 
+# Increment whenever the cleaning rules change to invalidate cached files
+_RULES_VERSION = 2
+
+# Strings that should only appear in department names
+_DEPARTMENTS = re.compile('|'.join([re.escape(_) for _ in sorted(set([
+    'admin', 'master', 'network', 'noc', 'netops', 'contact', 'wireless',
+    'operations', 'contact', 'support', 'dns', 'office', 'team', 'account',
+    'group', 'dept', 'department', 'service', 'eng', 'address', 'llc',
+    'information', 'security', 'cto', 'tech', 'telecom', 'center', 'chief',
+    'number', 'division', 'manag', 'ar''in', 'ops', 'whois', 'ceo', 'test',
+    'officer', 'cloud', 'president', 'owner', 'purchasing', 'help', 'desk',
+    'infra', 'billing', 'ltd', 'partner', 'registr', 'albuquerque',
+    'corp', 'founder', 'domain', 'internet', 'analyst', 'licence',
+    'ciso', 'office', 'operator', 'procure', 'register', 'notify', 'poc',
+    'ipaddr', 'isp', 'pilot', 'company', 'peer', 'coord', 'info@',
+    'scanning', 'routing', 'staff', 'internet', 'connect', 'allocation'
+]))]))
+
+# Strings that should only appear in department names, not people names
+_NAMES = re.compile('abuse|legal')
+
+# Characters ignored when checking for single letter names
+_ALPHANUMERIC = re.compile('[^0-9a-zA-Z]+')
+
+# Caribbean countries
+CARIBBEAN = [
+    'Anguilla', 'Antigua And Barbuda', 'Bahamas', 'Barbados',
+    'Bermuda', 'Cayman Islands', 'Dominica', 'Grenada', 'Jamaica',
+    'Saint Kitts And Nevis', 'Saint Lucia', 'Virgin Islands, U.S.',
+    'Saint Vincent And The Grenadines', 'Turks And Caicos Islands',
+    'Virgin Islands, British']
+
+# All states except those near Washington DC (DC, MD, VA), and all provinces
+# except those near Ottawa (QC)
+NON_CARIBBEAN = [
+    'AK', 'AL', 'AR', 'AZ', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA', 'HI',
+    'IA', 'ID', 'IL', 'IN', 'KS', 'KY', 'LA', 'MA', 'ME', 'MI', 'MN',
+    'MS', 'MO', 'MT', 'NC', 'NE', 'NH', 'NJ', 'NM', 'NV', 'NY', 'ND',
+    'OH', 'OK', 'OR', 'PA', 'RI', 'SC', 'SD', 'TN', 'TX', 'UT', 'VT',
+    'WA', 'WV', 'WI', 'WY',
+    'AB', 'BC', 'MB', 'NB', 'NL', 'NT', 'NS', 'NU', 'ON', 'PE', 'SK',
+    'YT'
+]
+
 
 class _Humans():
     """Extract data from Organization."""
@@ -26,6 +73,20 @@ class _Humans():
         """
         # Initialize key variables
         self._data = []
+        self._df = pd.DataFrame(columns=Person._fields)
+
+    def frame(self):
+        """Get the cleaned human email file as a DataFrame.
+
+        Args:
+            None
+
+        Returns:
+            result: DataFrame with one column per Person field
+
+        """
+        # Return
+        return self._df
 
     def complete(self):
         """Convert human email file to list of Person objects.
@@ -71,11 +132,12 @@ class _Humans():
 class SimpleHumans(_Humans):
     """Extract data from Organization."""
 
-    def __init__(self, filename):
+    def __init__(self, filename, cache=True):
         """Initialize the class.
 
         Args:
             filename: Name of tsv with humans
+            cache: Use a cached copy of the cleaned file if True
 
         Returns:
             None
@@ -83,17 +145,19 @@ class SimpleHumans(_Humans):
         """
         # Initialize key variables
         _Humans.__init__(self)
-        self._data = _simple_persons(filename)
+        self._df = _load(filename, 'simple', cache=cache)
+        self._data = records(self._df)
 
 
 class Humans(_Humans):
     """Extract data from Organization."""
 
-    def __init__(self, filename):
+    def __init__(self, filename, cache=True):
         """Initialize the class.
 
         Args:
             filename: Name of tsv with humans
+            cache: Use a cached copy of the cleaned file if True
 
         Returns:
             None
@@ -101,27 +165,59 @@ class Humans(_Humans):
         """
         # Initialize key variables
         _Humans.__init__(self)
-        self._data = _persons(filename)
+        self._df = _load(filename, 'humans', cache=cache)
+        self._data = records(self._df)
 
 
 class Strainer():
     """Extract data from Organization."""
 
-    def __init__(self, persons):
+    def __init__(self, persons, timestamps=None):
         """Initialize the class.
 
+        Indexes of the persons by country, state, email TLD, email domain and
+        the individual flag are created once so that each query is a lookup.
+
         Args:
             persons: List of Person objects
+            timestamps: Iterable of organization_updated timestamps, one per
+                person, such as the 'organization_epoch' column of
+                Humans.frame(). Parsed from the persons if None
 
         Returns:
             None
 
         """
         # Initialize key variables
-        self._persons = persons
+        self._persons = list(persons)
+        if timestamps is None:
+            timestamps = epochs(pd.Series(
+                [_.organization_updated for _ in self._persons],
+                dtype=object))
+        self._timestamps = np.asarray(timestamps, dtype=float)
         self._strict_domains = [
             '.net', '.com', '.edu', '.us', '.co', '.cloud', '.io', '.fm'
         ]
+        self._by_country = {}
+        self._by_state = {}
+        self._by_tld = {}
+        self._by_domain = {}
+        self._individuals = set()
+        self._strict = set()
+
+        # Create indexes of positions in the list of persons
+        for index, person in enumerate(self._persons):
+            email = person.email.lower()
+            self._by_country.setdefault(person.country, []).append(index)
+            self._by_state.setdefault(person.state, []).append(index)
+            self._by_tld.setdefault(
+                '.{}'.format(email.split('.')[-1]), []).append(index)
+            self._by_domain.setdefault(
+                email.split('@')[-1], []).append(index)
+            if person.individual is True:
+                self._individuals.add(index)
+            if self._skip(person) is False:
+                self._strict.add(index)
 
     def caribbean(self):
         """Return all Caribbean persons.
@@ -135,15 +231,9 @@ class Strainer():
         """
         # Initialize key variables
         result = []
-        countries = [
-            'Anguilla', 'Antigua And Barbuda', 'Bahamas', 'Barbados',
-            'Bermuda', 'Cayman Islands', 'Dominica', 'Grenada', 'Jamaica',
-            'Saint Kitts And Nevis', 'Saint Lucia', 'Virgin Islands, U.S.',
-            'Saint Vincent And The Grenadines', 'Turks And Caicos Islands',
-            'Virgin Islands, British']
 
         # Process and return
-        for _country in countries:
+        for _country in CARIBBEAN:
             result.extend(self.country(_country))
         return result
 
@@ -158,17 +248,10 @@ class Strainer():
             result: List of Persons from the country
 
         """
-        # Initialize key variables
-        result = []
-
         # Process and return
-        for person in self._persons:
-            if person.country == _country:
-                if bool(individuals_only) is False:
-                    result.append(person)
-                else:
-                    if person.individual is True:
-                        result.append(person)
+        result = self._select(
+            self._by_country.get(_country, []),
+            individuals_only=individuals_only)
         return result
 
     def state(self, _state,
@@ -187,29 +270,37 @@ class Strainer():
 
         """
         # Initialize key variables
-        result = []
+        indexes = self._by_state.get(_state, [])
+
+        # Filter by email domain
+        if bool(strict) is True:
+            indexes = [_ for _ in indexes if _ in self._strict]
+
+        # Filter by timestamp
+        if bool(timestamp) is True:
+            indexes = np.asarray(indexes, dtype=int)
+            indexes = indexes[
+                self._timestamps[indexes] >= timestamp].tolist()
 
         # Process and return
-        for person in self._persons:
-            if person.state == _state:
-                # Filter by email domain
-                if bool(strict) is True:
-                    if self._skip(person):
-                        continue
-
-                # Filter by timestamp
-                if bool(timestamp) is True:
-                    # print(person.organization_updated)
-                    ts_updated = misc.timestamp(person.organization_updated)
-                    if timestamp > ts_updated:
-                        continue
-
-                # Update the records
-                if bool(individuals_only) is False:
-                    result.append(person)
-                else:
-                    if person.individual is True:
-                        result.append(person)
+        result = self._select(indexes, individuals_only=individuals_only)
+        return result
+
+    def domain(self, _domain, individuals_only=False):
+        """Return all persons with email addresses in a specific domain.
+
+        Args:
+            _domain: Email domain to select
+            individuals_only: Only return individuals if True
+
+        Returns:
+            result: List of Persons in the domain
+
+        """
+        # Process and return
+        result = self._select(
+            self._by_domain.get(_domain.lower(), []),
+            individuals_only=individuals_only)
         return result
 
     def edu(self, individuals_only=False):
@@ -222,18 +313,9 @@ class Strainer():
             result: List of Persons
 
         """
-        # Initialize key variables
-        result = []
-
         # Process and return
-        for person in self._persons:
-            if person.email.lower().endswith('.edu'):
-                # Update the records
-                if bool(individuals_only) is False:
-                    result.append(person)
-                else:
-                    if person.individual is True:
-                        result.append(person)
+        result = self._select(
+            self._by_tld.get('.edu', []), individuals_only=individuals_only)
         return result
 
     def smallfry(self, individuals_only=False, threshold=40, strict=False):
@@ -249,29 +331,42 @@ class Strainer():
 
         """
         # Initialize key variables
-        result = []
+        indexes = []
 
         # Get the histogram of persons
         lookup = histogram(self._persons, individuals_only=individuals_only)
 
-        # Process data
-        for person in self._persons:
-            # Filter by email domain
-            if bool(strict) is True:
-                if self._skip(person):
-                    continue
-
-            # Append person to list if under the threshold for the state
-            count = lookup.get(person.state)
-            if bool(count) is True:
-                if count <= threshold:
-                    # Update the records
-                    if bool(individuals_only) is False:
-                        result.append(person)
-                    else:
-                        if person.individual is True:
-                            result.append(person)
+        # Get persons from states under the threshold
+        for _state, count in lookup.items():
+            if count <= threshold:
+                indexes.extend(self._by_state.get(_state, []))
+
+        # Filter by email domain
+        if bool(strict) is True:
+            indexes = [_ for _ in indexes if _ in self._strict]
+
+        # Return
+        result = self._select(
+            sorted(indexes), individuals_only=individuals_only)
+        return result
+
+    def _select(self, indexes, individuals_only=False):
+        """Get persons from their positions in the list of persons.
+
+        Args:
+            indexes: List of positions in the list of persons
+            individuals_only: Only return individuals if True
+
+        Returns:
+            result: List of Persons
+
+        """
+        # Filter individuals
+        if bool(individuals_only) is True:
+            indexes = [_ for _ in indexes if _ in self._individuals]
+
         # Return
+        result = [self._persons[_] for _ in indexes]
         return result
 
     def _skip(self, person):
@@ -293,134 +388,331 @@ class Strainer():
         return result
 
 
-def _persons(filename):
+def _persons(filename, cache=True):
     """Convert human email file to list of Person objects.
 
     Args:
         filename: Name of tsv with humans
+        cache: Use a cached copy of the cleaned file if True
 
     Returns:
         result: List of Person objects
 
+    """
+    # Return
+    result = records(_load(filename, 'humans', cache=cache))
+    return result
+
+
+def _simple_persons(filename, cache=True):
+    """Convert human email file to list of Person objects.
+
+    Args:
+        filename: Name of tsv with humans
+        cache: Use a cached copy of the cleaned file if True
+
+    Returns:
+        result: List of Person objects
+
+    """
+    # Return
+    result = records(_load(filename, 'simple', cache=cache))
+    return result
+
+
+def stream(filename, kind='humans', chunksize=50000):
+    """Yield Person objects from a human email file, one chunk at a time.
+
+    Memory use is bounded by the chunk size, whatever the size of the file.
+
+    Args:
+        filename: Name of tsv with humans
+        kind: 'humans' for scraper files, 'simple' for name and email files
+        chunksize: Maximum number of file rows to hold in memory
+
+    Returns:
+        None
+
+    """
+    # Process
+    for df_ in chunks(filename, kind=kind, chunksize=chunksize):
+        yield from records(df_)
+
+
+def chunks(filename, kind='humans', chunksize=50000):
+    """Yield cleaned DataFrames from a human email file, one chunk at a time.
+
+    Args:
+        filename: Name of tsv with humans
+        kind: 'humans' for scraper files, 'simple' for name and email files
+        chunksize: Maximum number of file rows to hold in memory
+
+    Returns:
+        None
+
     """
     # Initialize key variables
-    result = []
-    df_ = pd.read_csv(filename, header=0, delimiter='\t')
+    cleaner = _frame if kind == 'humans' else _simple_frame
 
-    # Convert Nan to None
-    df_ = df_.where(pd.notnull(df_), None)
+    # Process
+    with pd.read_csv(
+            os.path.abspath(os.path.expanduser(filename)), header=0,
+            delimiter='\t', chunksize=chunksize) as reader:
+        for df_ in reader:
+            yield cleaner(df_)
 
-    # Create 'firstname' and 'lastname' columns
-    df_['lastname'] = df_['contact_name'].str.split().str[-1]
-    df_['firstname'] = df_['contact_name'].str.split().str[0]
 
-    # Create Person objects
-    for _, row in df_.iterrows():
-        # Skip if too old
-        if _too_old(row['business_registration']):
-            continue
+def _load(filename, kind, cache=True):
+    """Read and clean a human email file, using a cache when it is current.
 
-        # Trim names
-        firstname = row[
-            'firstname'].strip() if bool(row['firstname']) else None
-        lastname = row[
-            'lastname'].strip() if bool(row['lastname']) else None
-        email = row[
-            'contact_email'].strip().lower() if bool(
-                row['contact_email']) else None
-        validated = 'valid' in row['contact_status'].lower()
-
-        # Skip this is a test account
-        if 'test' in firstname.lower() or 'test' in lastname.lower():
-            continue
+    The cleaned DataFrame is pickled next to the file. It is keyed by the
+    file's path, size and modification time and by the cleaning rules
+    version, so any change to these causes the file to be cleaned again.
 
-        # Skip unwanted email addresses
-        if _email_ok(email) is False:
-            continue
+    Args:
+        filename: Name of tsv with humans
+        kind: 'humans' for scraper files, 'simple' for name and email files
+        cache: Use a cached copy of the cleaned file if True
 
-        # Skip the obvious
-        domain = email.split('@')[-1]
-        if 'ar''in' in domain:
-            continue
+    Returns:
+        result: DataFrame with one column per Person field
 
-        # Get country and state information
-        address = row['business_address'].split(':')
-
-        # Get type of person record
-        contact_kind = row['contact_kind'].strip()
-
-        # Add to dict
-        if bool(email) is True:
-            result.append(
-                Person(
-                    firstname=firstname.title(),
-                    lastname=lastname.title(),
-                    email=_fix_email(email),
-                    individual=_is_individual(
-                        firstname, lastname, email, contact_kind),
-                    country=address[-1].title(),
-                    state=address[-3].upper(),
-                    validated=validated,
-                    organization=row['business_org'],
-                    organization_updated=row['business_updated']
-                )
-            )
+    """
+    # Initialize key variables
+    filename = os.path.abspath(os.path.expanduser(filename))
+    cleaner = _frame if kind == 'humans' else _simple_frame
+    stat = os.stat(filename)
+    key = (filename, stat.st_size, stat.st_mtime_ns, _RULES_VERSION, kind)
+    cache_file = '{}.{}.cache'.format(filename, kind)
+
+    # Read the cache
+    if bool(cache) is True and os.path.isfile(cache_file) is True:
+        try:
+            data = pd.read_pickle(cache_file)
+        except:
+            data = {}
+        if isinstance(data, dict) and data.get('key') == key:
+            return data['frame']
+
+    # Clean the file
+    result = cleaner(pd.read_csv(filename, header=0, delimiter='\t'))
+
+    # Update the cache, ignoring read-only directories
+    if bool(cache) is True:
+        try:
+            with tempfile.NamedTemporaryFile(
+                    delete=False, dir=os.path.dirname(filename)) as fh_:
+                pd.to_pickle({'key': key, 'frame': result}, fh_)
+            os.replace(fh_.name, cache_file)
+        except OSError:
+            pass
 
     # Return
     return result
 
 
-def _simple_persons(filename):
-    """Convert human email file to list of Person objects.
+def _frame(df_):
+    """Clean a scraper DataFrame using column-wise operations.
 
     Args:
-        filename: Name of tsv with humans
+        df_: DataFrame read from the scraper tsv file
+
+    Returns:
+        result: DataFrame with one column per Person field
+
+    """
+    # Skip if too old
+    registration = _text(df_['business_registration'])
+    df_ = df_[(registration != '') & (registration >= '2000')]
+
+    # Trim names, skipping records without names or emails
+    names = _text(df_['contact_name']).str.split()
+    firstname = names.str[0].fillna('').str.strip()
+    lastname = names.str[-1].fillna('').str.strip()
+    email = _text(df_['contact_email']).str.strip().str.lower()
+    keep = (firstname != '') & (lastname != '') & (email != '')
+
+    # Skip this is a test account
+    keep &= ~firstname.str.lower().str.contains('test', regex=False)
+    keep &= ~lastname.str.lower().str.contains('test', regex=False)
+
+    # Skip unwanted email addresses
+    keep &= _emails_ok(email)
+
+    # Apply the filters
+    df_ = df_[keep]
+    firstname = firstname[keep]
+    lastname = lastname[keep]
+    email = email[keep]
+
+    # Get country and state information
+    address = _text(df_['business_address']).str.split(':')
+
+    # Get type of person record
+    contact_kind = _text(df_['contact_kind']).str.strip()
+
+    # Create the Person columns
+    result = pd.DataFrame(
+        {
+            'firstname': firstname.str.title(),
+            'lastname': lastname.str.title(),
+            'email': _fix_emails(email),
+            'country': address.str[-1].str.title(),
+            'state': address.str[-3].str.upper(),
+            'individual': _individuals(
+                firstname, lastname, email, contact_kind),
+            'validated': _text(
+                df_['contact_status']).str.lower().str.contains(
+                    'valid', regex=False),
+            'organization': df_['business_org'],
+            'organization_updated': df_['business_updated'],
+            'organization_epoch': epochs(df_['business_updated']),
+        },
+        index=df_.index
+    )
+
+    # Return
+    return result
+
+
+def _simple_frame(df_):
+    """Clean a simple name and email DataFrame using column-wise operations.
+
+    Args:
+        df_: DataFrame read from the tsv file
+
+    Returns:
+        result: DataFrame with one column per Person field
+
+    """
+    # Trim names, skipping records without names or emails
+    names = _text(df_['Name']).str.split()
+    firstname = names.str[0].fillna('').str.strip()
+    lastname = names.str[-1].fillna('').str.strip()
+    email = _text(df_['Email']).str.strip().str.lower()
+    keep = (firstname != '') & (lastname != '') & (email != '')
+
+    # Skip unwanted email addresses
+    keep &= _emails_ok(email)
+
+    # Create the Person columns
+    result = pd.DataFrame(
+        {
+            'firstname': firstname[keep].str.title(),
+            'lastname': lastname[keep].str.title(),
+            'email': _fix_emails(email[keep]),
+            'country': None,
+            'state': None,
+            'individual': True,
+            'validated': True,
+            'organization': None,
+            'organization_updated': None,
+            'organization_epoch': np.nan,
+        },
+        index=df_.index[keep]
+    )
+
+    # Return
+    return result
+
+
+def records(df_):
+    """Convert a cleaned DataFrame to a list of Person objects.
+
+    Args:
+        df_: DataFrame with one column per Person field
 
     Returns:
         result: List of Person objects
 
+    """
+    # Convert NaN to None and numpy types to python types
+    columns = [
+        [None if pd.isna(_) else _ for _ in df_[field].tolist()]
+        for field in Person._fields
+    ]
+
+    # Return
+    result = [Person._make(_) for _ in zip(*columns)]
+    return result
+
+
+def epochs(updated):
+    """Convert a column of organization_updated dates to timestamps.
+
+    Each distinct date string is only parsed once.
+
+    Args:
+        updated: pandas Series of RFC3339 date strings
+
+    Returns:
+        result: pandas Series of float timestamps. NaN if not a valid date
+
     """
     # Initialize key variables
-    result = []
-    df_ = pd.read_csv(filename, header=0, delimiter='\t')
-
-    # Convert Nan to None
-    df_ = df_.where(pd.notnull(df_), None)
-
-    # Create 'firstname' and 'lastname' columns
-    df_['lastname'] = df_['Name'].str.split().str[-1]
-    df_['firstname'] = df_['Name'].str.split().str[0]
-
-    # Create Person objects
-    for _, row in df_.iterrows():
-        # Trim names
-        firstname = row[
-            'firstname'].strip() if bool(row['firstname']) else None
-        lastname = row[
-            'lastname'].strip() if bool(row['lastname']) else None
-        email = row['Email'].strip().lower() if bool(row['Email']) else None
-
-        # Skip unwanted email addresses
-        if _email_ok(email) is False:
+    lookup = {}
+
+    # Parse each date once
+    for datestring in updated.dropna().unique():
+        try:
+            lookup[datestring] = misc.timestamp(datestring)
+        except (ValueError, TypeError):
             continue
 
-        # Add to dict
-        if bool(email) is True:
-            result.append(
-                Person(
-                    firstname=firstname.title(),
-                    lastname=lastname.title(),
-                    email=_fix_email(email),
-                    individual=True,
-                    country=None,
-                    state=None,
-                    validated=True,
-                    organization=None,
-                    organization_updated=None
-                )
-            )
+    # Return
+    result = updated.map(lookup).astype(float)
+    return result
+
 
+def _text(series):
+    """Convert a DataFrame column to strings, with NaN as empty strings.
+
+    Args:
+        series: pandas Series
+
+    Returns:
+        result: pandas Series of str
+
+    """
     # Return
+    result = series.where(series.notna(), '').astype(str)
+    return result
+
+
+def _emails_ok(emails):
+    """Check the validity of a column of email addresses.
+
+    Args:
+        emails: pandas Series of lower case email addresses
+
+    Returns:
+        result: pandas Series of bool. True if valid
+
+    """
+    # No '.gov' or '.mil' domains, nor any ar''in addresses
+    domain = emails.str.split('@').str[-1]
+    result = ~domain.str.contains(
+        r'\.(?:gov|mil)$', regex=True) & ~domain.str.contains(
+            'ar''in', regex=False)
+    return result
+
+
+def _fix_emails(emails):
+    """Remove '+' sign from a column of email addresses.
+
+    Args:
+        emails: pandas Series of lower case email addresses
+
+    Returns:
+        result: pandas Series of fixed email addresses
+
+    """
+    # Return
+    plus = emails.str.contains('+', regex=False)
+    result = emails.where(
+        ~plus,
+        emails.str.split('+').str[0] + '@' + emails.str.split('@').str[-1]
+    )
     return result
 
 
@@ -440,62 +732,57 @@ def _is_individual(firstname, lastname, email, contact_kind):
     """
     # Initialize key variables
     result = True
-    departments = [
-        'admin', 'master', 'network', 'noc', 'netops', 'contact', 'wireless',
-        'operations', 'contact', 'support', 'dns', 'office', 'team', 'account',
-        'group', 'dept', 'department', 'service', 'eng', 'address', 'llc',
-        'information', 'security', 'cto', 'tech', 'telecom', 'center', 'chief',
-        'number', 'division', 'manag', 'ar''in', 'ops', 'whois', 'ceo', 'test',
-        'officer', 'cloud', 'president', 'owner', 'purchasing', 'help', 'desk',
-        'infra', 'billing', 'ltd', 'partner', 'registr', 'albuquerque',
-        'corp', 'founder', 'domain', 'internet', 'analyst', 'licence',
-        'ciso', 'office', 'operator', 'procure', 'register', 'notify', 'poc',
-        'ipaddr', 'isp', 'pilot', 'company', 'peer', 'coord', 'info@',
-        'scanning', 'routing', 'staff', 'internet', 'connect', 'allocation']
-    names = ['abuse', 'legal']
+    first = firstname.lower()
+    last = lastname.lower()
 
     # Check strings that should only appear in people and department names
-    for item in departments:
-        # Check typical department names
-        if item.lower() in firstname.lower() or (
-                item.lower() in lastname.lower()) or (
-                    item.lower() in email.lower().split('@')[0]):
-            result = False
-            break
-
-        # Check if firstname and lastname match
-        if firstname.lower() == lastname.lower():
-            result = False
-            break
+    if _DEPARTMENTS.search(first) or _DEPARTMENTS.search(last) or (
+            _DEPARTMENTS.search(email.lower().split('@')[0])):
+        result = False
 
-        # Eliminate IT departments
-        if firstname.lower() == 'it' or lastname.lower() == 'it':
-            result = False
-            break
+    # Check if firstname and lastname match, eliminate IT departments
+    elif first == last or first == 'it' or last == 'it':
+        result = False
 
-        # Check if firstname is a single letter.
-        # Can't be sure if it's individual or not.
-        if len(re.sub('[^0-9a-zA-Z]+', '', firstname)) == 1:
-            result = False
-            break
+    # Check if firstname is a single letter.
+    # Can't be sure if it's individual or not.
+    elif len(_ALPHANUMERIC.sub('', firstname)) == 1:
+        result = False
 
     # Check strings that should only appear in people names
-    for item in names:
-        # Check typical names
-        if item.lower() in firstname.lower() or (
-                item.lower() in lastname.lower()):
-            result = False
-            break
+    elif _NAMES.search(first) or _NAMES.search(last):
+        result = False
 
     # If the organization says that this is a group,
     # then it's not an individual
-    if contact_kind.lower() == 'group':
+    elif contact_kind.lower() == 'group':
         result = False
 
     # Return
     return result
 
 
+def _individuals(firstname, lastname, email, contact_kind):
+    """Determine whether each row of a table is a person or a department.
+
+    Args:
+        firstname: pandas Series of first names
+        lastname: pandas Series of last names
+        email: pandas Series of email addresses
+        contact_kind: pandas Series of the kind of contact (individual, group)
+
+    Returns:
+        result: pandas Series of bool. True if individual
+
+    """
+    # Return
+    result = pd.Series(
+        [_is_individual(*_) for _ in zip(
+            firstname, lastname, email, contact_kind)],
+        index=firstname.index, dtype=bool)
+    return result
+
+
 def _too_old(datestring, year='2000'):
     """Determine whether date is too old.
 
@@ -578,42 +865,35 @@ def goats(humans_, limit=3):
         limit: Number of entries to qualify as a GOAT
 
     Returns:
-        None
+        targets: List of Person objects, most frequent first
 
     """
-    # Initialize key variables
-    counter = {}
-    lookup = {}
-    targets = []
-
     # Get all records
-    everyone = humans_.complete()
-
-    # Get frequency data and create lookup
-    for person in everyone:
-        email = person.email
-        if counter.get(email):
-            counter[email] += 1
-            lookup[email].append(person)
-        else:
-            counter[email] = 1
-            lookup[email] = [person]
+    df_ = humans_.frame()
+
+    # Get frequency data, most frequent first
+    counts = df_.groupby('email', sort=False).size().sort_values(
+        ascending=False, kind='stable')
+    counts = counts[counts >= limit]
+    everyone = df_[df_['email'].isin(counts.index)]
+
+    # Get the most popular company name for each email address
+    companies = everyone.groupby(
+        ['email', 'organization'], dropna=False, sort=False).size()
+    companies = companies.reset_index(name='count').sort_values(
+        'count', ascending=False, kind='stable').drop_duplicates('email')
+
+    # Get the first person with that email address and company name
+    people = everyone.drop_duplicates(['email', 'organization']).merge(
+        companies[['email', 'organization']], on=['email', 'organization'])
+    people = people.set_index('email').loc[counts.index].reset_index()
 
     # Print result
-    for email, count in sorted(
-            counter.items(), key=lambda item: item[1], reverse=True):
-        # print(email)
-        if count >= limit:
-            print('{:<50}: {}'.format(email, count))
-
-            # Get the most popular company name
-            companies = [_.organization for _ in lookup[email]]
-            most_popular = max(set(companies), key=companies.count)
-            person = [
-                _ for _ in lookup[email] if _.organization == most_popular][0]
-            targets.append(person)
+    for email, count in counts.items():
+        print('{:<50}: {}'.format(email, count))
 
     # Update files
+    targets = records(people)
     return targets
 
 
@@ -629,30 +909,12 @@ def histogram(persons, individuals_only=False):
     """
     # Initialize key variables
     lookup = {}
-    non_caribbean = []
-
-    # All states except those near Washington DC (DC, MD, VA)
-    states = [
-        'AK', 'AL', 'AR', 'AZ', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA', 'HI',
-        'IA', 'ID', 'IL', 'IN', 'KS', 'KY', 'LA', 'MA', 'ME', 'MI', 'MN',
-        'MS', 'MO', 'MT', 'NC', 'NE', 'NH', 'NJ', 'NM', 'NV', 'NY', 'ND',
-        'OH', 'OK', 'OR', 'PA', 'RI', 'SC', 'SD', 'TN', 'TX', 'UT', 'VT',
-        'WA', 'WV', 'WI', 'WY'
-    ]
-
-    # All provinces except those near Ottawa (QC)
-    provinces = [
-        'AB', 'BC', 'MB', 'NB', 'NL', 'NT', 'NS', 'NU', 'ON', 'PE', 'SK',
-        'YT'
-    ]
-    non_caribbean.extend(states)
-    non_caribbean.extend(provinces)
 
     # Process data
     for person in persons:
         if bool(individuals_only) is True and person.individual is False:
             continue
-        if person.state in non_caribbean:
+        if person.state in NON_CARIBBEAN:
             found = lookup.get(person.state)
             if bool(found) is True:
                 lookup[person.state] += 1
@@ -0,0 +1,275 @@
+"""Application module to track the delivery of messages in SQLite.
+
+Each message is 'pending' until a worker claims it, 'in-flight' while the
+worker delivers it, then 'sent' or 'failed'. Claims expire after a lease, so
+messages claimed by runs that died are delivered by later runs.
+"""
+
+# Standard imports
+import time
+import sqlite3
+import threading
+import contextlib
+
+# Application imports
+from rain.Y2024.mailer import Envelope
+
+# Message states
+PENDING = "pending"
+IN_FLIGHT = "in-flight"
+SENT = "sent"
+FAILED = "failed"
+
+_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    payload TEXT,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease REAL NOT NULL DEFAULT 0,
+    updated REAL NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS messages_state ON messages (state, id);
+"""
+
+
+class Outbox:
+    """Persistent queue of messages to deliver."""
+
+    def __init__(self, filename, lease=600):
+        """Initialize the class.
+
+        Args:
+            filename: Name of SQLite database file. Created if required
+            lease: Seconds a claimed message stays in-flight before other
+                workers may claim it again
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self._lease = lease
+        self._lock = threading.Lock()
+
+        # Connect. Transactions are managed explicitly
+        self._connection = sqlite3.connect(
+            filename, timeout=60, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(_SCHEMA)
+
+    def __enter__(self):
+        """Enter the context.
+
+        Args:
+            None
+
+        Returns:
+            self: This object
+
+        """
+        # Return
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the database.
+
+        Args:
+            exc_type: Exception type
+            exc_value: Exception
+            traceback: Traceback
+
+        Returns:
+            False
+
+        """
+        # Return
+        self.close()
+        return False
+
+    def close(self):
+        """Close the database.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Close
+        with self._lock:
+            self._connection.close()
+
+    def add(self, items):
+        """Add messages to the outbox.
+
+        Messages whose key is already in the outbox are ignored, whatever
+        their state, so adding the same messages again is safe.
+
+        Args:
+            items: Iterable of (key, payload) tuples. Payloads are strings
+
+        Returns:
+            result: Number of messages added
+
+        """
+        # Add in a single transaction
+        with self._transaction() as cursor:
+            before = self._connection.total_changes
+            cursor.executemany(
+                """\
+INSERT OR IGNORE INTO messages (key, payload, updated) VALUES (?, ?, ?)""",
+                ((key, payload, time.time()) for key, payload in items),
+            )
+            result = self._connection.total_changes - before
+        return result
+
+    def claim(self, limit=1):
+        """Claim pending messages and messages with expired leases.
+
+        Args:
+            limit: Maximum number of messages to claim
+
+        Returns:
+            result: List of Envelope objects, oldest first
+
+        """
+        # Claim atomically
+        now = time.time()
+        with self._transaction() as cursor:
+            rows = cursor.execute(
+                """\
+SELECT id, key, payload, attempts FROM messages \
+WHERE state = ? OR (state = ? AND lease < ?) ORDER BY id LIMIT ?""",
+                (PENDING, IN_FLIGHT, now, limit),
+            ).fetchall()
+            cursor.executemany(
+                """\
+UPDATE messages SET state = ?, attempts = attempts + 1, lease = ?, \
+updated = ? WHERE id = ?""",
+                ((IN_FLIGHT, now + self._lease, now, _[0]) for _ in rows),
+            )
+
+        # Return
+        result = [
+            Envelope(id=id_, key=key, payload=payload, attempts=attempts + 1)
+            for id_, key, payload, attempts in rows
+        ]
+        return result
+
+    def sent(self, ids):
+        """Record messages as sent.
+
+        Args:
+            ids: Iterable of Envelope ids
+
+        Returns:
+            None
+
+        """
+        # Update
+        self._update(ids, SENT)
+
+    def failed(self, ids, error=None, retry=False):
+        """Record messages as failed.
+
+        Args:
+            ids: Iterable of Envelope ids
+            error: Description of the error
+            retry: Make the messages pending again if True
+
+        Returns:
+            None
+
+        """
+        # Update
+        self._update(ids, PENDING if bool(retry) is True else FAILED, error)
+
+    def retry(self):
+        """Make all failed messages pending again.
+
+        Args:
+            None
+
+        Returns:
+            result: Number of messages made pending
+
+        """
+        # Update
+        with self._transaction() as cursor:
+            result = cursor.execute(
+                "UPDATE messages SET state = ?, updated = ? WHERE state = ?",
+                (PENDING, time.time(), FAILED),
+            ).rowcount
+        return result
+
+    def counts(self):
+        """Get the number of messages in each state.
+
+        Args:
+            None
+
+        Returns:
+            result: Dict of counts keyed by state
+
+        """
+        # Return
+        result = {PENDING: 0, IN_FLIGHT: 0, SENT: 0, FAILED: 0}
+        with self._lock:
+            for state, count in self._connection.execute(
+                "SELECT state, COUNT(*) FROM messages GROUP BY state"
+            ):
+                result[state] = count
+        return result
+
+    def _update(self, ids, state, error=None):
+        """Set the state of messages.
+
+        Args:
+            ids: Iterable of Envelope ids
+            state: New state
+            error: Description of the error
+
+        Returns:
+            None
+
+        """
+        # Update
+        now = time.time()
+        with self._transaction() as cursor:
+            cursor.executemany(
+                """\
+UPDATE messages SET state = ?, lease = 0, updated = ?, error = ? \
+WHERE id = ?""",
+                ((state, now, error, _) for _ in ids),
+            )
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """Run a write transaction.
+
+        BEGIN IMMEDIATE takes the database write lock at the start of the
+        transaction, so the messages read while claiming can't be claimed by
+        other processes before they are updated.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Begin
+        with self._lock:
+            cursor = self._connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield cursor
+            except:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
@@ -0,0 +1,200 @@
+"""Application module to select contacts with declarative queries."""
+
+# PIP imports
+import pandas as pd
+
+# Library imports
+from rain.Y2024.mailer import humans
+
+
+class Contacts():
+    """Select persons from a contact table using Query objects."""
+
+    def __init__(self, df_):
+        """Initialize the class.
+
+        Args:
+            df_: DataFrame with one column per Person field. This is the
+                value of Humans.frame()
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self._df = df_
+        self._epochs = None
+        self._masks = {}
+
+        # Create columns used by many queries
+        emails = df_['email'].fillna('').astype(str)
+        tlds = '.' + emails.str.split('.').str[-1]
+        self._strict = tlds.isin(
+            ['.net', '.com', '.edu', '.us', '.co', '.cloud', '.io', '.fm'])
+        self._edu = emails.str.lower().str.endswith('.edu')
+        self._individual = df_['individual'].fillna(False).astype(bool)
+
+    def select(self, segments):
+        """Select the persons of many segments at once.
+
+        Each email address is only returned once, in the first segment whose
+        query it matches. As with Thunderbird.generate over Strainer results,
+        persons are ordered by the position of their country in the query's
+        countries, then by file order, and each email address is placed where
+        it first appears but uses its last matching record.
+
+        Args:
+            segments: List of Segment objects
+
+        Returns:
+            result: Dict of lists of Person objects keyed by segment label
+
+        """
+        # Initialize key variables
+        result = {}
+        seen = pd.Series(False, index=self._df.index)
+
+        # Process segments in order
+        for segment in segments:
+            mask = self.mask(segment.query) & ~seen
+            selected = _unique(
+                self._order(self._df[mask], segment.query))
+
+            # Exclude these email addresses from subsequent segments
+            seen |= self._df['email'].isin(selected['email'])
+            result.setdefault(segment.label, []).extend(
+                humans.records(selected))
+
+        # Return
+        return result
+
+    def mask(self, query):
+        """Evaluate a query against every contact at once.
+
+        Args:
+            query: Query object
+
+        Returns:
+            result: pandas Series of bool. True if the contact matches
+
+        """
+        # Initialize key variables
+        result = pd.Series(True, index=self._df.index)
+
+        # Apply each predicate
+        if bool(query.countries) is True:
+            result &= self._isin('country', query.countries)
+        if bool(query.states) is True:
+            result &= self._isin('state', query.states)
+        if bool(query.individuals_only) is True:
+            result &= self._individual
+        if bool(query.strict) is True:
+            result &= self._strict
+        if bool(query.edu) is True:
+            result &= self._edu
+        if bool(query.updated_after) is True:
+            result &= self.epochs() >= query.updated_after
+        if query.threshold is not None:
+            result &= self._isin(
+                'state', self._smallfry(
+                    query.threshold, query.individuals_only))
+
+        # Return
+        return result
+
+    def epochs(self):
+        """Get the organization update times as timestamps.
+
+        The timestamps parsed when the file was loaded are used if present.
+
+        Args:
+            None
+
+        Returns:
+            result: pandas Series of timestamps
+
+        """
+        # Parse once
+        if self._epochs is None:
+            if 'organization_epoch' in self._df.columns:
+                self._epochs = self._df['organization_epoch']
+            else:
+                self._epochs = humans.epochs(self._df['organization_updated'])
+
+        # Return
+        return self._epochs
+
+    def _order(self, df_, query):
+        """Order selected contacts the way the Strainer listed them.
+
+        Args:
+            df_: DataFrame of selected contacts
+            query: Query object
+
+        Returns:
+            result: DataFrame ordered by country, then file order
+
+        """
+        # Return
+        if bool(query.countries) is False:
+            return df_
+        positions = {country: _ for _, country in enumerate(query.countries)}
+        result = df_.iloc[
+            df_['country'].map(positions).argsort(kind='stable')]
+        return result
+
+    def _isin(self, column, values):
+        """Get a cached membership mask for a column.
+
+        Args:
+            column: Name of column
+            values: List of values
+
+        Returns:
+            result: pandas Series of bool
+
+        """
+        # Return
+        key = (column, tuple(sorted(values)))
+        if key not in self._masks:
+            self._masks[key] = self._df[column].isin(list(key[1]))
+        return self._masks[key]
+
+    def _smallfry(self, threshold, individuals_only=False):
+        """Get states and provinces with few organizations.
+
+        Args:
+            threshold: Maximum number of contacts in the state
+            individuals_only: Only count individuals if True
+
+        Returns:
+            result: List of states
+
+        """
+        # Count contacts per state, as humans.histogram does
+        mask = self._isin('state', humans.NON_CARIBBEAN)
+        if bool(individuals_only) is True:
+            mask = mask & self._individual
+        counts = self._df.loc[mask, 'state'].value_counts()
+
+        # Return
+        result = counts[counts <= threshold].index.tolist()
+        return result
+
+
+def _unique(df_):
+    """Keep one contact per email address.
+
+    Args:
+        df_: DataFrame of contacts
+
+    Returns:
+        result: DataFrame with the last contact for each email address, in
+            the order the email addresses first appear
+
+    """
+    # Return
+    order = df_['email'].drop_duplicates(keep='first')
+    result = df_.drop_duplicates('email', keep='last').set_index(
+        'email', drop=False).loc[order.values]
+    return result
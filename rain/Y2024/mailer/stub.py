@@ -0,0 +1,235 @@
+"""Application module for a local SMTP server used to test mail delivery.
+
+The server accepts any login and discards every message. It is a stand in for
+a real mail server when measuring the cost of sending, and can simulate slow
+session setup and servers that drop sessions.
+"""
+
+# Standard imports
+import time
+import threading
+import socketserver
+
+
+class Server:
+    """Local SMTP server running in a background thread."""
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        latency=0,
+        delay=0,
+        drop_after=None,
+        refuse=None,
+    ):
+        """Initialize the class.
+
+        Args:
+            host: IP address to listen on
+            port: TCP port to listen on. Any free port if 0
+            latency: Seconds to wait before greeting and before accepting a
+                login. This simulates the round trips of session setup
+            delay: Seconds to wait before accepting each message
+            drop_after: Drop sessions after this many messages if not None
+            refuse: Dict of SMTP reply codes keyed by the recipient email
+                addresses to refuse, such as 550 for unknown users or 450
+                for mailboxes that are temporarily unavailable
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.latency = latency
+        self.delay = delay
+        self.drop_after = drop_after
+        self.refuse = {} if refuse is None else refuse
+        self.sessions = 0
+        self.messages = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+        # Create the server
+        self._server = _TCPServer((host, port), _Handler)
+        self._server.stub = self
+
+    @property
+    def address(self):
+        """Get the address the server listens on.
+
+        Args:
+            None
+
+        Returns:
+            result: Tuple of (host, port)
+
+        """
+        # Return
+        result = self._server.server_address[:2]
+        return result
+
+    def __enter__(self):
+        """Start the server.
+
+        Args:
+            None
+
+        Returns:
+            self: This object
+
+        """
+        # Return
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop the server.
+
+        Args:
+            exc_type: Exception type
+            exc_value: Exception
+            traceback: Traceback
+
+        Returns:
+            False
+
+        """
+        # Return
+        self.stop()
+        return False
+
+    def start(self):
+        """Start the server.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Start
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the server.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Stop
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def count(self, sessions=0, messages=0):
+        """Update the server statistics.
+
+        Args:
+            sessions: Number of sessions to add
+            messages: Number of messages to add
+
+        Returns:
+            None
+
+        """
+        # Update
+        with self._lock:
+            self.sessions += sessions
+            self.messages += messages
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    """Threaded TCP server."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Handle a single SMTP session."""
+
+    def handle(self):
+        """Process SMTP commands until the client quits.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        stub = self.server.stub
+        messages = 0
+        stub.count(sessions=1)
+
+        # Greet
+        time.sleep(stub.latency)
+        self._reply("220 localhost ESMTP stub")
+
+        # Process commands
+        for line in self.rfile:
+            command = line.decode("utf-8", "replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+
+            if verb == "EHLO":
+                self._reply("250-localhost", "250-AUTH PLAIN", "250 OK")
+            elif verb == "HELO":
+                self._reply("250 localhost")
+            elif verb == "AUTH":
+                time.sleep(stub.latency)
+                self._reply("235 2.7.0 Authentication successful")
+            elif verb == "RCPT" and bool(stub.refuse) is True:
+                address = command.split(":", 1)[-1].strip().strip("<>")
+                code = stub.refuse.get(address.lower())
+                if code is None:
+                    self._reply("250 OK")
+                else:
+                    self._reply(f"{code} Recipient refused")
+            elif verb in ["MAIL", "RCPT", "RSET", "NOOP"]:
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                for data in self.rfile:
+                    if data in [b".\r\n", b".\n"]:
+                        break
+                time.sleep(stub.delay)
+                messages += 1
+                stub.count(messages=1)
+                self._reply("250 OK")
+
+                # Drop the session without warning
+                if (
+                    stub.drop_after is not None
+                    and messages >= stub.drop_after
+                ):
+                    return
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+    def _reply(self, *lines):
+        """Send reply lines to the client.
+
+        Args:
+            lines: Lines to send
+
+        Returns:
+            None
+
+        """
+        # Send
+        self.wfile.write("".join(f"{_}\r\n" for _ in lines).encode("utf-8"))
+        self.wfile.flush()
@@ -0,0 +1,129 @@
+"""Application module to write campaign output files."""
+
+# Standard imports
+import os
+import contextlib
+
+
+class Writer:
+    """Buffered campaign output file kept consistent with its history."""
+
+    def __init__(self, filename, history_, buffering=1048576):
+        """Initialize the class.
+
+        The output file is kept open, and the history file locked, from the
+        time the writer is entered until it exits. Entering the writer again
+        while it is open has no effect, so each method of an object using it
+        can enter it whether or not the caller already has.
+
+        Args:
+            filename: Name of the output file
+            history_: history.History object
+            buffering: Size of the output file buffer in bytes
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self._filename = filename
+        self._history = history_
+        self._buffering = buffering
+        self._fh = None
+        self._stack = None
+        self._depth = 0
+
+    def __enter__(self):
+        """Open the output file and lock the history.
+
+        Args:
+            None
+
+        Returns:
+            self: Writer object
+
+        """
+        # Open once
+        if self._depth == 0:
+            with contextlib.ExitStack() as stack:
+                stack.enter_context(self._history.transaction())
+                self._fh = stack.enter_context(
+                    open(
+                        self._filename,
+                        "a",
+                        encoding="utf-8",
+                        buffering=self._buffering,
+                    )
+                )
+                self._stack = stack.pop_all()
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Checkpoint and close the output file, then unlock the history.
+
+        Lines already written are kept along with their email addresses even
+        if an exception occurred, so output and history stay consistent.
+
+        Args:
+            exc_type: Exception type
+            exc_value: Exception
+            traceback: Traceback
+
+        Returns:
+            False
+
+        """
+        # Close once
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                self.checkpoint()
+            finally:
+                self._fh = None
+                self._stack.close()
+                self._stack = None
+        return False
+
+    def write(self, lines, emails=None):
+        """Write lines to the output file buffer.
+
+        Args:
+            lines: List of lines to write, without line endings
+            emails: Email addresses to add to the history with the lines
+
+        Returns:
+            None
+
+        """
+        # Write
+        self._fh.write("".join(f"{_}\n" for _ in lines))
+        if bool(emails) is True:
+            self._history.add(emails)
+
+    def checkpoint(self):
+        """Save everything written so far.
+
+        The output file is flushed and synced to disk before the history, so
+        no email address is recorded as contacted before its output line is
+        saved.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Nothing to do
+        if self._fh is None:
+            return
+
+        # Output file first, then history
+        try:
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+        except:
+            self._history.rollback()
+            raise
+        self._history.commit()
@@ -0,0 +1,272 @@
+"""Application module for a local RDAP server used to test the scraper.
+
+The server answers every entity request with a generated organization that
+has one administrative contact. It can simulate slow responses and rate
+limits, answering 429 with a Retry-After header when clients request entities
+faster than it allows.
+"""
+
+# Standard imports
+import json
+import time
+import threading
+import collections
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class Server:
+    """Local RDAP server running in a background thread."""
+
+    def __init__(
+        self, host="127.0.0.1", port=0, rate=None, latency=0, retry_after=1
+    ):
+        """Initialize the class.
+
+        Args:
+            host: IP address to listen on
+            port: TCP port to listen on. Any free port if 0
+            rate: Maximum requests per second answered. Requests above the
+                rate get 429 responses. No limit if None
+            latency: Seconds to wait before each response
+            retry_after: Retry-After header value of 429 responses. The
+                header is omitted if None
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.rate = rate
+        self.latency = latency
+        self.retry_after = retry_after
+        self.requests = 0
+        self.throttled = 0
+        self._recent = collections.deque()
+        self._lock = threading.Lock()
+        self._thread = None
+
+        # Create the server
+        self._server = _HTTPServer((host, port), _Handler)
+        self._server.stub = self
+
+    @property
+    def url(self):
+        """Get the base URL of entities.
+
+        Args:
+            None
+
+        Returns:
+            result: URL
+
+        """
+        # Return
+        host, port = self._server.server_address[:2]
+        result = f"http://{host}:{port}/entity"
+        return result
+
+    def __enter__(self):
+        """Start the server.
+
+        Args:
+            None
+
+        Returns:
+            self: This object
+
+        """
+        # Return
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop the server.
+
+        Args:
+            exc_type: Exception type
+            exc_value: Exception
+            traceback: Traceback
+
+        Returns:
+            False
+
+        """
+        # Return
+        self.stop()
+        return False
+
+    def start(self):
+        """Start the server.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Start
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the server.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Stop
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def allow(self):
+        """Count a request and decide whether to answer it.
+
+        Args:
+            None
+
+        Returns:
+            result: True if the request is within the rate limit
+
+        """
+        # Count requests in the last second
+        now = time.monotonic()
+        with self._lock:
+            self.requests += 1
+            if self.rate is None:
+                return True
+            while bool(self._recent) is True and now - self._recent[0] >= 1:
+                self._recent.popleft()
+            result = len(self._recent) < self.rate
+            if result is True:
+                self._recent.append(now)
+            else:
+                self.throttled += 1
+        return result
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    """Threaded HTTP server."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Handle a single RDAP request."""
+
+    def do_GET(self):
+        """Answer entity requests.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        stub = self.server.stub
+        handle = self.path.rstrip("/").split("/")[-1]
+
+        # Refuse requests above the rate limit
+        time.sleep(stub.latency)
+        if stub.allow() is False:
+            self.send_response(429)
+            if stub.retry_after is not None:
+                self.send_header("Retry-After", str(stub.retry_after))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        # Answer
+        data = json.dumps(_entity(handle)).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rdap+json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        """Don't log requests.
+
+        Args:
+            args: Log arguments
+
+        Returns:
+            None
+
+        """
+        # Nothing to do
+        return
+
+
+def _entity(handle):
+    """Create the RDAP data of an organization.
+
+    Args:
+        handle: Organization handle
+
+    Returns:
+        result: Dict of RDAP data
+
+    """
+    # Return
+    result = {
+        "handle": handle,
+        "vcardArray": [
+            "vcard",
+            [
+                ["version", {}, "text", "4.0"],
+                ["fn", {}, "text", f"Organization {handle}"],
+                [
+                    "adr",
+                    {"label": "1 Main Street\nSpringfield\nUS"},
+                    "text",
+                    ["", "", "", "", "", "", ""],
+                ],
+                ["kind", {}, "text", "org"],
+            ],
+        ],
+        "events": [
+            {
+                "eventAction": "registration",
+                "eventDate": "2010-01-01T00:00:00Z",
+            },
+            {
+                "eventAction": "last changed",
+                "eventDate": "2020-01-01T00:00:00Z",
+            },
+        ],
+        "entities": [
+            {
+                "handle": f"{handle}-ADMIN",
+                "roles": ["administrative"],
+                "status": ["validated"],
+                "vcardArray": [
+                    "vcard",
+                    [
+                        ["version", {}, "text", "4.0"],
+                        ["fn", {}, "text", f"Admin {handle}"],
+                        ["email", {}, "text", f"{handle.lower()}@example.org"],
+                        ["kind", {}, "text", "individual"],
+                    ],
+                ],
+                "events": [
+                    {
+                        "eventAction": "last changed",
+                        "eventDate": "2021-01-01T00:00:00Z",
+                    }
+                ],
+            }
+        ],
+    }
+    return result
@@ -0,0 +1,98 @@
+"""Rate limiting functions."""
+
+# Standard imports
+import time
+import threading
+
+
+class TokenBucket:
+    """Token bucket rate limiter, safe to share between threads."""
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        """Initialize the class.
+
+        Args:
+            rate: Tokens added to the bucket per second
+            capacity: Maximum number of tokens in the bucket. This is the
+                largest burst allowed. The rate, or 1 if lower, if None
+            clock: Function returning the time in seconds
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.rate = float(rate)
+        self.capacity = (
+            max(1.0, self.rate) if capacity is None else float(capacity)
+        )
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def delay(self, tokens=1):
+        """Reserve tokens from the bucket.
+
+        Tokens are reserved immediately, even when the bucket doesn't have
+        enough of them, so callers that wait for the returned time are
+        served in the order they called.
+
+        Args:
+            tokens: Number of tokens to reserve
+
+        Returns:
+            result: Seconds to wait before using the tokens
+
+        """
+        # Reserve
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            result = max(0.0, -self._tokens / self.rate)
+        return result
+
+    def acquire(self, tokens=1):
+        """Wait until tokens are available, then use them.
+
+        Args:
+            tokens: Number of tokens to use
+
+        Returns:
+            None
+
+        """
+        # Wait
+        time.sleep(self.delay(tokens=tokens))
+
+    def update(self, rate):
+        """Change the rate of the bucket.
+
+        Args:
+            rate: Tokens added to the bucket per second
+
+        Returns:
+            None
+
+        """
+        # Update using the old rate up to now
+        with self._lock:
+            self._refill()
+            self.rate = float(rate)
+
+    def _refill(self):
+        """Add the tokens accumulated since the last update.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Refill
+        now = self._clock()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now